@@ -1 +1,2 @@
 from .log_analyzer import LogAnalyzer
+from .keyword_matcher import KeywordMatcher, get_keyword_matcher
@@ -0,0 +1,69 @@
+"""Multi-keyword substring matching for line-oriented log scans.
+
+A pyahocorasick automaton finds every keyword in one pass over a line when the
+package is installed; otherwise a single compiled regex alternation is used as
+the prefilter. Keywords are matched as-is, so callers pass lowercase keywords
+and lowercased text.
+"""
+import re
+from functools import lru_cache
+
+try:
+    import ahocorasick  # optional: pyahocorasick C extension
+    _AC_AVAILABLE = True
+except Exception:
+    ahocorasick = None  # type: ignore
+    _AC_AVAILABLE = False
+
+
+class KeywordMatcher:
+    """Answer "which of these keywords occur in this text" for a fixed keyword set."""
+
+    def __init__(self, keywords):
+        self.keywords = tuple(dict.fromkeys(k for k in keywords if k))
+        self._rank = {kw: i for i, kw in enumerate(self.keywords)}
+        self._automaton = None
+        self._regex = None
+        if not self.keywords:
+            return
+        if _AC_AVAILABLE:
+            automaton = ahocorasick.Automaton()
+            for kw in self.keywords:
+                automaton.add_word(kw, kw)
+            automaton.make_automaton()
+            self._automaton = automaton
+        else:
+            alternation = '|'.join(map(re.escape, sorted(self.keywords, key=len, reverse=True)))
+            self._regex = re.compile(alternation)
+
+    def search(self, text: str) -> bool:
+        """True if any keyword occurs in text."""
+        if self._automaton is not None:
+            return next(self._automaton.iter(text), None) is not None
+        return self._regex is not None and self._regex.search(text) is not None
+
+    def found(self, text: str) -> set:
+        """All keywords occurring in text (overlapping occurrences included)."""
+        if self._automaton is not None:
+            return {kw for _end, kw in self._automaton.iter(text)}
+        if not self.search(text):
+            return set()
+        return {kw for kw in self.keywords if kw in text}
+
+    def first(self, text: str):
+        """The earliest keyword (in the order given) that occurs in text, or None."""
+        if self._automaton is not None:
+            hits = self.found(text)
+            return min(hits, key=self._rank.__getitem__) if hits else None
+        if not self.search(text):
+            return None
+        for kw in self.keywords:
+            if kw in text:
+                return kw
+        return None
+
+
+@lru_cache(maxsize=256)
+def get_keyword_matcher(keywords: tuple) -> KeywordMatcher:
+    """Shared matcher per keyword tuple so automata are built once per process."""
+    return KeywordMatcher(keywords)
@@ -2,6 +2,8 @@ import re
 import os
 from datetime import datetime
 
+from .keyword_matcher import get_keyword_matcher
+
 class LogAnalyzer:
     def __init__(self):
         self.issue_categories = {
@@ -153,32 +155,47 @@ class LogAnalyzer:
         return self._empty_result('Memory Issues', sub_issue_type, 'Custom Memory Analysis')
 
     # --- Dispatcher ---
-    def analyze_issue_by_type(self, log_content, main_issue_type, sub_issue_type, package_name=None):
-        if package_name:
-            log_content = self.filter_logs_by_package(log_content, package_name)
-        mapping = {
-            'Audio Issues': self.analyze_audio_issues,
-            'Camera Issues': self.analyze_camera_issues,
-            'App Crashes': self.analyze_app_crashes,
-            'UI Issues': self.analyze_ui_issues,
-            'Network Issues': self.analyze_network_issues,
-            'Multimedia Issues': self.analyze_multimedia_issues,
-            'Bluetooth Issues': self.analyze_bluetooth_issues,
-            'App Installation': self.analyze_app_installation_issues,
-            'Battery Issues': self.analyze_battery_issues,
-            'Storage Issues': self.analyze_storage_issues,
-            'Security Issues': self.analyze_security_issues,
-            'Memory Issues': self.analyze_memory_issues,
-        }
-        handler = mapping.get(main_issue_type)
-        if handler:
+    _HANDLERS = {
+        'Audio Issues': 'analyze_audio_issues',
+        'Camera Issues': 'analyze_camera_issues',
+        'App Crashes': 'analyze_app_crashes',
+        'UI Issues': 'analyze_ui_issues',
+        'Network Issues': 'analyze_network_issues',
+        'Multimedia Issues': 'analyze_multimedia_issues',
+        'Bluetooth Issues': 'analyze_bluetooth_issues',
+        'App Installation': 'analyze_app_installation_issues',
+        'Battery Issues': 'analyze_battery_issues',
+        'Storage Issues': 'analyze_storage_issues',
+        'Security Issues': 'analyze_security_issues',
+        'Memory Issues': 'analyze_memory_issues',
+    }
+
+    def compile_for(self, main_issue_type, sub_issue_type):
+        """Resolve the handler for one (main, sub) pair and return f(log_content, package_name=None).
+
+        Callers analysing many logs for the same selection can keep the returned
+        callable and skip the dispatch on every call.
+        """
+        handler_name = self._HANDLERS.get(main_issue_type)
+        if handler_name is None:
+            def analyze_unknown(log_content, package_name=None):
+                return {
+                    'issue_type': f'{main_issue_type} - {sub_issue_type}',
+                    'relevant_logs': [],
+                    'root_cause': f'Unknown issue type: {main_issue_type}',
+                    'analysis_method': 'Unknown Analysis Method'
+                }
+            return analyze_unknown
+        handler = getattr(self, handler_name)
+
+        def analyze(log_content, package_name=None):
+            if package_name:
+                log_content = self.filter_logs_by_package(log_content, package_name)
             return handler(log_content, sub_issue_type, package_name)
-        return {
-            'issue_type': f'{main_issue_type} - {sub_issue_type}',
-            'relevant_logs': [],
-            'root_cause': f'Unknown issue type: {main_issue_type}',
-            'analysis_method': 'Unknown Analysis Method'
-        }
+        return analyze
+
+    def analyze_issue_by_type(self, log_content, main_issue_type, sub_issue_type, package_name=None):
+        return self.compile_for(main_issue_type, sub_issue_type)(log_content, package_name)
 
     # --- Utility methods ---
     def filter_logs_by_package(self, log_content, package_name):
@@ -233,34 +250,33 @@ class LogAnalyzer:
             ('App Crashes', 'Device Reboot'): ['fatal exception in system process'],
         }
         allowlist = [a.lower() for a in allowlists.get(key, [])]
+        # One automaton pass per line finds every keyword; most lines match none and
+        # are dropped before the noise / allowlist checks run
+        kw_matcher = get_keyword_matcher(tuple(keywords_lower))
+        noise_matcher = get_keyword_matcher(tuple(noise_substrings))
         results = []
         # Simulate readline loop (no need to allocate all lines twice)
         lines = log_content.splitlines()
         for idx, line in enumerate(lines, start=1):
             low = line.lower()
+            matched_kw = kw_matcher.first(low)
+            if not matched_kw:
+                continue
             if restrict_activitymanager:
                 # Skip noisy slow operation / battery stat lines
                 if 'activitymanager' in low and ('slow operation' in low or 'starting to update pids map' in low or 'done updating pids map' in low):
                     continue
             # Skip any globally noisy lines
-            if any(ns in low for ns in noise_substrings):
-                continue
-            matched_kw = None
-            for kw in keywords_lower:
-                if kw in low:
-                    matched_kw = kw
-                    break
-            if not matched_kw:
+            if noise_matcher.search(low):
                 continue
             if allowlist:
                 if not any(a in low for a in allowlist):
                     continue
-            if matched_kw:
-                results.append({
-                    'line_number': idx,
-                    'matched_line': line.rstrip(),
-                    'keyword': matched_kw
-                })
+            results.append({
+                'line_number': idx,
+                'matched_line': line.rstrip(),
+                'keyword': matched_kw
+            })
         return results
 
     def identify_issue_type(self, log_content, problem_description):
@@ -313,18 +329,18 @@ class LogAnalyzer:
             'Fatal signal',     # Native crash
             'am_crash',         # ActivityManager event
         ]
+        marker_by_lower = {mk.lower(): mk for mk in fatal_markers}
+        matcher = get_keyword_matcher(tuple(marker_by_lower))
         try:
             with open(file_path, 'r', errors='ignore') as f:
                 for idx, line in enumerate(f, start=1):
-                    low = line.lower()
-                    for mk in fatal_markers:
-                        if mk.lower() in low:
-                            yield {
-                                'line_number': idx,
-                                'matched_line': line.rstrip(),
-                                'marker': mk
-                            }
-                            break
+                    hit = matcher.first(line.lower())
+                    if hit:
+                        yield {
+                            'line_number': idx,
+                            'matched_line': line.rstrip(),
+                            'marker': marker_by_lower[hit]
+                        }
         except Exception:
             return
 
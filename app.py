@@ -1,5 +1,7 @@
-from flask import Flask, render_template, request, jsonify, flash, redirect, url_for
+from flask import Flask, Response, render_template, stream_template, request, jsonify, flash, redirect, url_for
+from jinja2 import FileSystemBytecodeCache
 import os
+import io
 import shutil
 import re
 import json
@@ -9,13 +11,21 @@ from werkzeug.utils import secure_filename
 from datetime import datetime
 import logging
 import math
-from collections import Counter
+from bisect import bisect_left, bisect_right
+from collections import Counter, ChainMap
 import uuid
 import time
 import subprocess
 import sys
 import threading
+import functools
+import heapq
+import multiprocessing
+from itertools import repeat
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 from importlib import metadata as importlib_metadata
+from typing import Optional
 
 # Attempt to import advanced duplicate finder (semantic support)
 try:
@@ -30,6 +40,18 @@ try:
         get_ai_assistant = None
 except Exception:
     SimpleTranslator = None
+try:
+    import numpy as np
+except Exception:
+    np = None
+try:
+    from sklearn.feature_extraction.text import TfidfVectorizer
+except Exception:
+    TfidfVectorizer = None  # DuplicateFinder falls back to difflib ratios
+try:
+    import orjson
+except Exception:
+    orjson = None  # stdlib json fallback
 
 app = Flask(__name__)
 AI_MODE = os.environ.get('PLM_AI', '0') == '1'
@@ -72,6 +94,7 @@ def admin_clear_cache():
     """Manually clear persistent cache and in-memory analyses; returns stats."""
     stats = clear_persistent_cache()
     LOG_CACHE.clear()
+    _clear_log_artifacts()
     stats.update({'status': 'cleared', 'in_memory_cleared': True})
     return jsonify(stats)
 
@@ -224,6 +247,12 @@ LOG_CACHE = {}
 MAX_CACHE_ITEMS = 5
 CACHE_DIR = os.path.join(os.path.dirname(__file__), 'cache_store')
 os.makedirs(CACHE_DIR, exist_ok=True)
+# Compiled template bytecode persists across worker restarts; Jinja keys it by template
+# checksum so it never goes stale, and clear_persistent_cache leaves it in place.
+JINJA_CACHE_DIRNAME = '_jinja'
+JINJA_CACHE_DIR = os.path.join(CACHE_DIR, JINJA_CACHE_DIRNAME)
+os.makedirs(JINJA_CACHE_DIR, exist_ok=True)
+app.jinja_env.bytecode_cache = FileSystemBytecodeCache(JINJA_CACHE_DIR)
 # cache_store usage:
 #  - Persist per-upload raw log copy and derived analysis JSON/metadata so user can refresh page without re-upload.
 #  - Temporary embeddings / duplicate detection artifacts.
@@ -245,6 +274,7 @@ ISSUE_TYPE_MAP = {
     'Storage Issues': ['Space Problems', 'File Corruption', 'SD Card Issues'],
     'Security Issues': ['Permission Denied', 'Authentication Failed', 'Root Detection']
 }
+_TOTAL_PAIRS = sum(len(v) for v in ISSUE_TYPE_MAP.values())
 
 def _prune_cache():
     if len(LOG_CACHE) <= MAX_CACHE_ITEMS:
@@ -252,6 +282,7 @@ def _prune_cache():
     oldest = sorted(LOG_CACHE.items(), key=lambda kv: kv[1]['created'])[:len(LOG_CACHE)-MAX_CACHE_ITEMS]
     for k, _ in oldest:
         LOG_CACHE.pop(k, None)
+    _clear_log_artifacts()
 
 def _cache_size_bytes():
     total = 0
@@ -263,12 +294,19 @@ def _cache_size_bytes():
                 pass
     return total
 
+# Upload ids whose log.txt is being spooled and read back. The id is added before its
+# cache dir is created, so clear_persistent_cache never removes a dir mid-upload.
+_INFLIGHT_UPLOADS = set()
+
 def clear_persistent_cache():
-    """Recursively delete all files & folders in CACHE_DIR; return stats."""
+    """Recursively delete all files & folders in CACHE_DIR (except the Jinja bytecode
+    cache and in-flight uploads); return stats."""
     before = _cache_size_bytes()
     removed_files = 0
     removed_dirs = 0
     for entry in os.scandir(CACHE_DIR):
+        if entry.name == JINJA_CACHE_DIRNAME or entry.name in _INFLIGHT_UPLOADS:
+            continue
         try:
             if entry.is_file():
                 os.remove(entry.path)
@@ -322,7 +360,7 @@ def prune_cache_size():
 # Clear on app startup
 clear_persistent_cache()
 prune_cache_size()
-from analyzers import LogAnalyzer
+from analyzers import LogAnalyzer, get_keyword_matcher
 
 # =============================
 # Helper utilities & persistence
@@ -333,8 +371,19 @@ ALLOWED_EXTENSIONS = {'.txt', '.log'}
 def allowed_file(filename: str) -> bool:
     return os.path.splitext(filename)[1].lower() in ALLOWED_EXTENSIONS
 
+# TF-IDF cosine * 100 scores reworded duplicates well below difflib ratios
+LIGHTWEIGHT_DEFAULT_THRESHOLD = 40.0
+
 # Lightweight duplicate finder fallback (simple similarity) if advanced not used
 class DuplicateFinder:
+    """TF-IDF cosine duplicate finder used when the semantic finder is off.
+
+    The corpus matrix is fitted once in __init__, so each query costs one sparse
+    matmul instead of a SequenceMatcher run per issue. Scores are cosine * 100 so
+    the existing 0-100 threshold field still applies; cosine runs lower than
+    difflib ratios on reworded text, hence the lower LIGHTWEIGHT_DEFAULT_THRESHOLD.
+    Without scikit-learn we keep difflib.
+    """
     def __init__(self, csv_path):
         self.issues = []
         try:
@@ -347,6 +396,26 @@ class DuplicateFinder:
                         self.issues.append({'title': title, 'content': content})
         except Exception:
             pass
+        self._joined_lower = [(i['title'] + ' ' + i['content']).strip().lower() for i in self.issues]
+        self._vec = None
+        self._M = None
+        if TfidfVectorizer is not None and self.issues:
+            self._fit_tfidf()
+        if self._vec is None:
+            # difflib path: issues ordered by text length for the length-window shortlist
+            lens = [len(t) for t in self._joined_lower]
+            self._order = sorted(range(len(lens)), key=lens.__getitem__)
+            self._sorted_lens = [lens[i] for i in self._order]
+
+    def _fit_tfidf(self):
+        # Keep every term (min_df=1): words unique to one issue are what identify its
+        # duplicate. A corpus with no usable token at all raises ValueError -> difflib.
+        try:
+            vec = TfidfVectorizer(ngram_range=(1, 2), min_df=1, sublinear_tf=True)
+            self._M = vec.fit_transform(self._joined_lower)
+            self._vec = vec
+        except ValueError:
+            self._vec = self._M = None
 
     def get_issue_statistics(self):
         return {
@@ -358,78 +427,179 @@ class DuplicateFinder:
         out=[]
         if not base:
             return out
-        for issue in self.issues:
-            candidate = (issue['title'] + ' ' + issue['content']).strip()
+        if self._vec is not None:
+            return self._find_tfidf(base.lower(), threshold, max_results)
+        base_lower = base.lower()
+        for i in self._length_window(len(base_lower), threshold):
+            issue, candidate = self.issues[i], self._joined_lower[i]
             if not candidate:
                 continue
-            ratio = difflib.SequenceMatcher(None, base.lower(), candidate.lower()).ratio()*100
+            ratio = difflib.SequenceMatcher(None, base_lower, candidate).ratio()*100
             if ratio >= threshold:
                 out.append({'issue': issue, 'similarity': round(ratio,2)})
         out.sort(key=lambda x: x['similarity'], reverse=True)
         return out[:max_results]
 
+    def _length_window(self, base_len, threshold):
+        """Indices (CSV order) of issues whose length can still reach threshold.
+
+        SequenceMatcher.ratio() is 2*M/(la+lb) with M <= min(la, lb), so a score of
+        t = threshold/100 needs t*la/(2-t) <= lb <= la*(2-t)/t; both ends are found
+        by bisecting the length-sorted order instead of scoring every issue.
+        """
+        t = threshold / 100.0
+        if t <= 0:
+            return range(len(self.issues))
+        if t >= 2:
+            return []
+        slack = 1e-9  # keep float rounding from dropping an exact boundary length
+        lo = bisect_left(self._sorted_lens, base_len * t / (2 - t) * (1 - slack))
+        hi = bisect_right(self._sorted_lens, base_len * (2 - t) / t * (1 + slack))
+        return sorted(self._order[lo:hi])
+
+    def _find_tfidf(self, base_lower, threshold, max_results):
+        # Rows are L2-normalised by the vectorizer, so the dot product is the cosine.
+        q = self._vec.transform([base_lower])
+        sims = (self._M @ q.T).toarray().ravel() * 100
+        k = min(max_results, sims.size)
+        if k <= 0:
+            return []
+        top = np.argpartition(-sims, k - 1)[:k]
+        top = top[np.argsort(-sims[top], kind='stable')]
+        out = []
+        for i in top:
+            score = float(sims[i])
+            if score < threshold:
+                break
+            out.append({'issue': self.issues[i], 'similarity': round(score, 2)})
+        return out
+
 # Persistence helpers
+def _json_dumps_bytes(obj) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(obj)
+    return json.dumps(obj, separators=(',', ':')).encode('utf-8')
+
+_json_loads = orjson.loads if orjson is not None else json.loads
+
+def _json(payload, status: int = 200) -> Response:
+    """JSON response encoded with orjson when available (jsonify always uses stdlib json)."""
+    return Response(_json_dumps_bytes(payload), status=status, mimetype='application/json')
+
+UPLOAD_CHUNK_BYTES = 1024 * 1024  # copy buffer when spooling uploads to disk
+
+_LOG_ID_RE = re.compile(r'^[0-9a-f]{32}$')
+
+def _new_log_id() -> str:
+    return uuid.uuid4().hex
+
 def _cache_entry_dir(log_id: str) -> str:
     return os.path.join(CACHE_DIR, log_id)
 
+def _stream_upload_to_cache(file_storage, log_id: str) -> str:
+    """Spool an uploaded log into the entry's cache dir in fixed-size chunks and
+    return the path. _persist_entry later finds log.txt present and skips rewriting it."""
+    d = _cache_entry_dir(log_id)
+    os.makedirs(d, exist_ok=True)
+    raw_path = os.path.join(d, 'log.txt')
+    with open(raw_path, 'wb') as out:
+        shutil.copyfileobj(file_storage.stream, out, UPLOAD_CHUNK_BYTES)
+    return raw_path
+
 def _persist_entry(log_id: str):
     entry = LOG_CACHE.get(log_id)
     if not entry:
         return
     d = _cache_entry_dir(log_id)
     os.makedirs(d, exist_ok=True)
-    # Write raw log (only once)
+    # Write raw log (only once); O_EXCL makes the existence check part of the open
     raw_path = os.path.join(d, 'log.txt')
-    if not os.path.exists(raw_path):
-        with open(raw_path, 'w', encoding='utf-8', errors='ignore') as f:
+    try:
+        fd = os.open(raw_path, os.O_WRONLY | os.O_CREAT | os.O_EXCL | getattr(os, 'O_BINARY', 0))
+    except FileExistsError:
+        pass
+    else:
+        with open(fd, 'w', encoding='utf-8', errors='ignore') as f:
             f.write(entry['log'])
-    # Meta (analyses) minimal persistence (just list of analyzed pairs)
+    # Meta (analyses) minimal persistence (just list of analyzed pairs); keys are
+    # snapshotted since request threads may add analyses while this runs
     meta_path = os.path.join(d, 'meta.json')
     meta = {
         'created': entry['created'],
         'package_name': entry['package_name'],
-        'pairs': list(map(lambda k: {'main': k[0], 'sub': k[1]}, entry['analyses'].keys()))
+        'pairs': list(map(lambda k: {'main': k[0], 'sub': k[1]}, list(entry['analyses'])))
     }
-    with open(meta_path, 'w', encoding='utf-8') as f:
-        json.dump(meta, f)
+    # Concurrent persists of one log each write a private temp file; os.replace swaps it
+    # in atomically, so readers never see a torn meta.json
+    tmp_path = f'{meta_path}.{uuid.uuid4().hex}.tmp'
+    try:
+        with open(tmp_path, 'wb') as f:
+            f.write(_json_dumps_bytes(meta))
+        os.replace(tmp_path, meta_path)
+    except BaseException:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        raise
+
+# Persistence runs on a small background pool so requests don't wait on disk writes
+_PERSIST_EXECUTOR = ThreadPoolExecutor(max_workers=2, thread_name_prefix='persist')
+
+def _log_persist_failure(fut):
+    exc = fut.exception()
+    if exc is not None:
+        logger.warning(f"Failed persisting cache entry: {exc}")
+
+def _persist_entry_async(log_id: str):
+    _PERSIST_EXECUTOR.submit(_persist_entry, log_id).add_done_callback(_log_persist_failure)
 
 def _load_cache_from_disk():
     try:
-        for log_id in os.listdir(CACHE_DIR):
-            d = _cache_entry_dir(log_id)
-            if not os.path.isdir(d):
-                continue
-            raw_path = os.path.join(d, 'log.txt')
-            meta_path = os.path.join(d, 'meta.json')
-            if not os.path.exists(raw_path) or not os.path.exists(meta_path):
-                continue
-            with open(raw_path, 'r', encoding='utf-8', errors='ignore') as f:
-                log_content = f.read()
-            with open(meta_path, 'r', encoding='utf-8') as f:
-                meta = json.load(f)
-            LOG_CACHE[log_id] = {
-                'log': log_content,
-                'package_name': meta.get('package_name'),
-                'created': meta.get('created', time.time()),
-                'analyses': {},
-                'eager_mode': False
-            }
+        # scandir's DirEntry.is_dir() uses the d_type from the listing, and opening the
+        # files directly replaces separate exists() probes
+        with os.scandir(CACHE_DIR) as it:
+            for entry in it:
+                if not entry.is_dir() or not _LOG_ID_RE.match(entry.name):
+                    continue
+                try:
+                    with open(os.path.join(entry.path, 'meta.json'), 'rb') as f:
+                        meta = _json_loads(f.read())
+                    with open(os.path.join(entry.path, 'log.txt'), 'r', encoding='utf-8', errors='ignore') as f:
+                        log_content = f.read()
+                except FileNotFoundError:
+                    continue
+                LOG_CACHE[entry.name] = {
+                    'log': log_content,
+                    'package_name': meta.get('package_name'),
+                    'created': meta.get('created', time.time()),
+                    'analyses': {},
+                    'eager_mode': False
+                }
     except Exception as e:
         logger.warning(f"Failed loading cache persistence: {e}")
 
 _load_cache_from_disk()
 
-def _analyze_pair(analyzer: LogAnalyzer, log_content: str, package: str, main: str, sub: str):
-    return analyzer.analyze_issue_by_type(log_content, main, sub, package)
+# LogAnalyzer keeps no per-call state, so one instance is shared by every request
+# thread and by the compiled per-pair callables below
+_ANALYZER = LogAnalyzer()
+
+@functools.lru_cache(maxsize=128)
+def _compiled_for(main: str, sub: str):
+    """Analysis callable for one (main, sub) pair, resolved once and shared by all threads."""
+    return _ANALYZER.compile_for(main, sub)
 
-def _store_log_with_analyses(log_content: str, package_name: str, analyzer_factory, selected_pair):
+def _analyze_pair(log_content: str, package: str, main: str, sub: str):
+    return _compiled_for(main, sub)(log_content, package)
+
+def _store_log_with_analyses(log_content: str, package_name: str, selected_pair, log_id: Optional[str] = None):
     """Store a log and compute ONLY the selected (main, sub) analysis.
     Eager mode removed: we no longer precompute all issue types to simplify UX and performance."""
-    log_id = str(uuid.uuid4())
-    analyzer = analyzer_factory()
+    log_id = log_id or _new_log_id()
     analyses = {}
     main, sub = selected_pair
-    analyses[(main, sub)] = _analyze_pair(analyzer, log_content, package_name, main, sub)
+    analyses[(main, sub)] = _analyze_pair(log_content, package_name, main, sub)
     LOG_CACHE[log_id] = {
         'log': log_content,
         'package_name': package_name,
@@ -437,7 +607,7 @@ def _store_log_with_analyses(log_content: str, package_name: str, analyzer_facto
         'analyses': analyses
     }
     _prune_cache()
-    _persist_entry(log_id)
+    _persist_entry_async(log_id)
     return log_id
 
 def _build_analysis_preview(analysis_result: dict) -> str:
@@ -448,12 +618,7 @@ def _build_analysis_preview(analysis_result: dict) -> str:
     relevant = analysis_result.get('relevant_logs') or []
     if not relevant:
         return 'No relevant log lines extracted for this issue.'
-    out_lines = []
-    for rl in relevant:
-        matched = rl.get('matched_line') or ''
-        if matched:
-            out_lines.append(matched)
-    return '\n'.join(out_lines).strip()
+    return '\n'.join(m for rl in relevant for m in (rl.get('matched_line'),) if m).strip()
 
 def _ensure_analysis(log_id: str, main: str, sub: str):
     entry = LOG_CACHE.get(log_id)
@@ -461,14 +626,13 @@ def _ensure_analysis(log_id: str, main: str, sub: str):
         raise KeyError('log id not found')
     key=(main, sub)
     if key not in entry['analyses']:
-        analyzer = LogAnalyzer()
-        res = _analyze_pair(analyzer, entry['log'], entry['package_name'], main, sub)
+        res = _analyze_pair(entry['log'], entry['package_name'], main, sub)
         entry['analyses'][key]=res
-        _persist_entry(log_id)
+        _persist_entry_async(log_id)
     return entry['analyses'][key]
 
 def _build_metrics(entry):
-    total_pairs = sum(len(v) for v in ISSUE_TYPE_MAP.values())
+    total_pairs = _TOTAL_PAIRS
     analyzed_pairs = len(entry['analyses'])
     per_category_counts = {}
     for (main, _sub) in entry['analyses'].keys():
@@ -487,7 +651,10 @@ def index():
 
 @app.route('/duplicate-finder')
 def duplicate_finder():
-    return render_template('duplicate_finder.html', ai_mode=AI_MODE)
+    # AI mode runs the semantic finder regardless of the checkbox, so render its scale
+    semantic_default = AI_MODE and AdvancedDuplicateFinder is not None
+    return render_template('duplicate_finder.html', ai_mode=AI_MODE, semantic_default=semantic_default,
+                           default_threshold=80 if semantic_default else int(LIGHTWEIGHT_DEFAULT_THRESHOLD))
 
 @app.route('/ai_help')
 def ai_help_page():
@@ -551,13 +718,22 @@ def api_ai_explain_logs():
         logger.exception('ai_explain_logs error')
         return jsonify({'error': 'internal', 'detail': str(e)}), 500
 
-_translator_instance = None
+# Target languages offered by translate.html; other form values fall back to the first,
+# so the per-language translator cache stays bounded
+TRANSLATE_TARGET_LANGS = ('en',)
+_translator_instances = {}
 
 def _get_translator(target_lang: str = 'en'):
-    global _translator_instance
-    if _translator_instance is None and SimpleTranslator is not None:
-        _translator_instance = SimpleTranslator(target_lang=target_lang)
-    return _translator_instance
+    # One translator per target language: engines are built for a fixed target
+    if SimpleTranslator is None:
+        return None
+    target_lang = (target_lang or '').strip().lower()
+    if target_lang not in TRANSLATE_TARGET_LANGS:
+        target_lang = TRANSLATE_TARGET_LANGS[0]
+    inst = _translator_instances.get(target_lang)
+    if inst is None:
+        inst = _translator_instances.setdefault(target_lang, SimpleTranslator(target_lang=target_lang))
+    return inst
 
 @app.route('/translate', methods=['GET', 'POST'])
 def translate_page():
@@ -585,13 +761,14 @@ def find_duplicates():
         problem_title = request.form.get('problem_title', '').strip()
         problem_content = request.form.get('problem_content', '').strip()
         csv_file = request.files.get('csv_file')
-        threshold = float(request.form.get('similarity_threshold', 80.0))
         # If AI_MODE is active, default semantic on unless user explicitly disabled
         use_semantic_form = request.form.get('use_semantic') == '1'
         if AI_MODE:
             use_semantic = True if AdvancedDuplicateFinder is not None else False
         else:
             use_semantic = use_semantic_form
+        default_threshold = 80.0 if use_semantic else LIGHTWEIGHT_DEFAULT_THRESHOLD
+        threshold = float(request.form.get('similarity_threshold') or default_threshold)
         
         if not problem_title and not problem_content:
             flash('Please provide either problem title or content', 'error')
@@ -659,7 +836,9 @@ def find_duplicates():
             'method_info': method_info or {}
         }
         results['ai_mode'] = AI_MODE
-        return render_template('duplicate_results.html', result=results, ai_mode=AI_MODE)
+        # Stream the rendered page so large duplicate lists start reaching the client
+        # before the whole template is rendered (stream_template keeps the request context)
+        return Response(stream_template('duplicate_results.html', result=results, ai_mode=AI_MODE))
     except Exception as e:
         logger.error(f"Error finding duplicates: {str(e)}")
         flash(f'Error finding duplicates: {str(e)}', 'error')
@@ -692,36 +871,45 @@ def upload_file():
         # Clear persistent cache before processing a new upload to avoid stale growth
         clear_persistent_cache()
         prune_cache_size()
-        # Read entire log file once
-        raw_bytes = file.read()
-        size = len(raw_bytes)
-        log_content = raw_bytes.decode('utf-8', errors='ignore')
+        # Spool the upload to disk in bounded chunks, then decode once from the file so the
+        # raw bytes and the decoded text are never resident together.
+        log_id = _new_log_id()
+        _INFLIGHT_UPLOADS.add(log_id)
+        try:
+            raw_path = _stream_upload_to_cache(file, log_id)
+            size = os.path.getsize(raw_path)
+            with open(raw_path, 'r', encoding='utf-8', errors='ignore', newline='') as f:
+                log_content = f.read()
+        finally:
+            _INFLIGHT_UPLOADS.discard(log_id)
         logger.info(f"UPLOAD size={size}B main={main_issue_type} sub={sub_issue_type}")
         log_id = _store_log_with_analyses(
             log_content,
             package_name,
-            analyzer_factory=lambda: LogAnalyzer(),
-            selected_pair=(main_issue_type, sub_issue_type)
+            selected_pair=(main_issue_type, sub_issue_type),
+            log_id=log_id
         )
-        current = LOG_CACHE[log_id]['analyses'].get((main_issue_type, sub_issue_type))
-        current = dict(current)
-        # Always set preview to analysis-only relevant logs (no global system properties)
-        current['preview_log'] = _build_analysis_preview(current)
-        # We no longer load or build full-log previews or summaries for the preview pane (always issue-only lines)
-        current['raw_log_preview'] = ''
-        current['raw_line_count'] = 0
-        current['summary'] = ''
-        current['log_id'] = log_id
-        current['all_issue_types'] = ISSUE_TYPE_MAP
-        # metrics removed from UI; keeping computation optional if needed elsewhere
-        # current['metrics'] = _build_metrics(LOG_CACHE[log_id])
-        current['main_issue_type'] = main_issue_type
-        current['sub_issue_type'] = sub_issue_type
-        current['selected_issue'] = f"{main_issue_type} - {sub_issue_type}"
-        current['package_name'] = package_name
+        cached = LOG_CACHE[log_id]['analyses'].get((main_issue_type, sub_issue_type))
         from datetime import datetime as _dt
-        current['timestamp'] = _dt.now().strftime('%Y-%m-%d %H:%M:%S')
-        # TODO: Inline display enhancement: render on index without navigation (AJAX JSON response + DOM update)
+        # Per-request fields overlay the cached analysis via ChainMap instead of copying it
+        response = {
+            # Always set preview to analysis-only relevant logs (no global system properties)
+            'preview_log': _build_analysis_preview(cached),
+            # We no longer load or build full-log previews or summaries for the preview pane (always issue-only lines)
+            'raw_log_preview': '',
+            'raw_line_count': 0,
+            'summary': '',
+            'log_id': log_id,
+            'all_issue_types': ISSUE_TYPE_MAP,
+            # metrics removed from UI; keeping computation optional if needed elsewhere
+            # 'metrics': _build_metrics(LOG_CACHE[log_id]),
+            'main_issue_type': main_issue_type,
+            'sub_issue_type': sub_issue_type,
+            'selected_issue': f"{main_issue_type} - {sub_issue_type}",
+            'package_name': package_name,
+            'timestamp': _dt.now().strftime('%Y-%m-%d %H:%M:%S'),
+        }
+        current = ChainMap(response, cached)
         return render_template('results.html', result=current)
     except Exception as e:
         logger.error(f"Error processing file: {str(e)}")
@@ -739,7 +927,7 @@ def api_analyze():
         if not log_content or not problem_description:
             return jsonify({'error': 'Missing required fields'}), 400
         
-        analyzer = LogAnalyzer()
+        analyzer = _ANALYZER
         identified_issues = analyzer.identify_issue_type(log_content, problem_description)
         
         if not identified_issues:
@@ -781,10 +969,9 @@ def switch_issue():
         if not entry:
             return jsonify({'error': 'log_not_found'}), 404
         # ensure / compute analysis
-        analyzer = LogAnalyzer()
         key = (main_issue_type, sub_issue_type)
         if key not in entry['analyses']:
-            res = _analyze_pair(analyzer, entry['log'], entry['package_name'], main_issue_type, sub_issue_type)
+            res = _analyze_pair(entry['log'], entry['package_name'], main_issue_type, sub_issue_type)
             entry['analyses'][key] = res
         result = dict(entry['analyses'][key])
         preview_log = _build_analysis_preview(result)
@@ -802,9 +989,370 @@ def switch_issue():
         logger.exception('switch_issue failure')
         return jsonify({'error': 'internal', 'detail': str(e)}), 500
 
+# Derived per-log arrays (encoded buffer, newline index, token index) are held in LRU
+# caches keyed by log id rather than on LOG_CACHE entries, so only the most recently
+# used logs keep them. Log ids are never reused; removing entries clears the caches.
+LOG_ARTIFACT_CACHE_SIZE = 8
+
+# Line boundaries of str.splitlines() besides LF and CRLF
+_OTHER_LINE_SEPS_RE = re.compile(r'\r(?!\n)|[\x0b\x0c\x1c-\x1e\x85\u2028\u2029]')
+
+@functools.lru_cache(maxsize=LOG_ARTIFACT_CACHE_SIZE)
+def _get_lineidx(log_id: str):
+    """UTF-8 bytes of a cached log and the byte positions of its LF characters.
+
+    Built with a single vectorized compare when numpy is available and shared by smart
+    detection and the raw log views, instead of each keeping a splitlines() list. Line
+    numbers match str.splitlines(): logs holding any other separator it honours (lone
+    CR, VT, FF, \x1c-\x1e, NEL, U+2028/9) are re-joined with LF first.
+    """
+    text = LOG_CACHE[log_id]['log']
+    if _OTHER_LINE_SEPS_RE.search(text):
+        lines = text.splitlines()
+        text = '\n'.join(lines) + '\n' if lines else ''
+    buf = text.encode('utf-8', 'replace')
+    if np is not None:
+        lf = np.flatnonzero(np.frombuffer(buf, dtype=np.uint8) == 10)
+    else:
+        lf = [m.start() for m in re.finditer(b'\n', buf)]
+    return buf, lf
+
+def _clear_log_artifacts():
+    _get_lineidx.cache_clear()
+    _get_token_index.cache_clear()
+
+def _line_count(buf, lf) -> int:
+    # A final newline does not start an extra empty line (same as splitlines)
+    return len(lf) + (1 if buf and not buf.endswith(b'\n') else 0)
+
+def _iter_lines(buf, lf, first=0, last=None, encoding='utf-8'):
+    """Decode lines [first, last) (0-based) of an indexed buffer, dropping a trailing CR."""
+    last = _line_count(buf, lf) if last is None else min(last, _line_count(buf, lf))
+    a = int(lf[first - 1]) + 1 if first else 0
+    n_lf = len(lf)
+    for k in range(first, last):
+        b = int(lf[k]) if k < n_lf else len(buf)
+        line = buf[a:b].decode(encoding, 'replace')
+        yield line[:-1] if line.endswith('\r') else line
+        a = b + 1
+
+# Case fold for a whole buffer in one C pass. Smart-detect tokens and keywords are ASCII,
+# and U+0130 and U+212A are the only non-ASCII characters whose lowercase contains ASCII
+_ASCII_LOWER = bytes.maketrans(bytes(range(256)), bytes(range(256)).lower())
+_ASCII_FOLDING_UTF8 = ('\u0130'.encode('utf-8'), '\u212a'.encode('utf-8'))
+
+def _ascii_lower(buf: bytes):
+    """Buffer with ASCII letters lowercased (same offsets), or None if str.lower() is needed."""
+    if any(seq in buf for seq in _ASCII_FOLDING_UTF8):
+        return None
+    return buf.translate(_ASCII_LOWER)
+
 # =============================
 # Smart Detection (AI) Prototype
 # =============================
+# Word tokens for smart detection (lowercase input expected by callers)
+_TOKEN_RE = re.compile(r'[A-Za-z0-9_]+')
+
+# Sentiment lexicon (simple) for optional boosting; negative and positive terms are
+# disjoint, so one merged table answers both with a single set intersection per line
+_SENT_NEGATIVE = {
+    'fail': -0.9,'failed': -1.0,'failure': -1.0,'crash': -1.0,'crashes': -1.0,'fatal': -1.0,'error': -0.8,'exception': -0.85,
+    'anr': -0.9,'timeout': -0.7,'watchdog': -0.8,'panic': -1.0,'reset': -0.6,'reboot': -0.6,'overheat': -0.7,
+    'denied': -0.5,'reject': -0.6,'corrupt': -0.9,'oom': -1.0,'leak': -0.7,'stuck': -0.6,'hang': -0.7
+}
+_SENT_POSITIVE = {'success': 0.4,'ok':0.2,'started':0.1,'initialized':0.15,'connected':0.2,'recovered':0.3,'resume':0.1}
+_SENT = {**_SENT_NEGATIVE, **_SENT_POSITIVE}
+_SENT_KEYS = frozenset(_SENT)
+
+# Config-dump lines ("Name:", "KeyMgmt ...", short "key: value" pairs) fused into one
+# anchored alternation; the last branch is bounded to <80 chars and <=6 words, and its
+# key group is re-checked with str.isalpha() since [^\W\d_] also admits non-decimal numerics
+_CFG_RE = re.compile(
+    r'[A-Z][A-Za-z0-9_-]{1,32}:\s*$'
+    r'|(?i:KeyMgmt|PairwiseCiphers|GroupCiphers|Protocols|AuthAlgorithms)\b'
+    r'|(?=.{0,79}$)(?P<key>[^\W\d_]{1,24}):\S*(?:\s+\S+){0,5}$'
+)
+
+
+def _looks_like_config(line: str) -> bool:
+    m = _CFG_RE.match(line.strip())
+    return m is not None and (m.group('key') is None or m.group('key').isalpha())
+
+
+@functools.lru_cache(maxsize=65536)
+def _tok_set(line_lower: str) -> frozenset:
+    # Reboot/bootloop logs repeat many lines verbatim, so token sets are memoized per
+    # scan; _score_chunk clears the cache when it finishes
+    return frozenset(_TOKEN_RE.findall(line_lower))
+
+
+# Reboot-mode lines that mention boot terms but are dumpsys noise rather than events
+_REBOOT_NOISE_PATTERNS = (
+    re.compile(r'ContentProviderRecord', re.IGNORECASE),
+    re.compile(r'^\s*Client:\s*$', re.IGNORECASE),
+    re.compile(r'nothing to dump', re.IGNORECASE),
+)
+
+# Logs with at least this many lines are scored across worker processes when the app is
+# started as a script (see _start_smart_pool): PLM_SMART_WORKERS workers, default
+# min(4, CPUs), 0 disables. Importing app (tests, WSGI servers) never forks. Only fork
+# on Linux is used: spawned workers would re-import this module and re-run its startup
+# cache clearing, and fork is unsafe on macOS
+SMART_DETECT_MAX_DEFAULT_WORKERS = 4
+SMART_DETECT_WORKERS = int(os.environ.get('PLM_SMART_WORKERS')
+                           or min(SMART_DETECT_MAX_DEFAULT_WORKERS, os.cpu_count() or 1))
+SMART_DETECT_PARALLEL_MIN_LINES = 50_000
+_FORK_CTX = multiprocessing.get_context('fork') if sys.platform.startswith('linux') else None
+_SMART_POOL = None
+
+
+def _score_chunk(chunk_lines, start_idx, prob_tokens, booster_tokens, reboot_mode, threshold, model, max_lines,
+                 lower_lines=None, line_numbers=None):
+    """Score one contiguous run of log lines (numbered from start_idx).
+
+    lower_lines optionally supplies the lines already lowercased (ASCII is enough);
+    otherwise each line is lowercased here. line_numbers (ascending) replaces the
+    contiguous numbering when only selected lines are passed in.
+
+    Returns (top, total_candidates, above_threshold, excluded_config, excluded_noise, zero_overlap)
+    where top is a heap of at most max_lines (score, -n, base, boost, text, hits, sentiment)
+    tuples at or above threshold. Module-level so it can run in a worker process.
+    """
+    prob_tokens_all = frozenset(prob_tokens | booster_tokens)
+    reboot_noise_patterns = _REBOOT_NOISE_PATTERNS if reboot_mode else ()
+    excluded_config = 0
+    zero_overlap = 0
+    excluded_noise = 0
+
+    # A line can only share a token with the problem if some problem token occurs in it
+    # as a substring, so one automaton pass rejects most lines before tokenizing
+    prob_matcher = get_keyword_matcher(tuple(sorted(prob_tokens_all)))
+    # Bind per-line lookups (globals, bound methods, the model check) to locals once
+    prob_search = prob_matcher.search
+    token_search = _TOKEN_RE.search
+    tok_set = _tok_set
+    is_sentiment = model == 'sentiment_lexicon'
+    denom = len(prob_tokens_all) + 1e-6
+    # score = total_overlap / denom, times at most 1.5 with sentiment boosting, so any
+    # line whose integer overlap is below this floor cannot reach the threshold
+    min_total = math.floor(threshold * denom / (1.5 if is_sentiment else 1.0))
+    total_candidates = 0
+    above_threshold = 0
+    # Min-heap of the best max_lines lines so far; heap[0] is the weakest kept line
+    top = []
+    heappush = heapq.heappush
+    heapreplace = heapq.heapreplace
+    if lower_lines is None:
+        pairs = ((line, line.lower()) for line in chunk_lines)
+    else:
+        pairs = zip(chunk_lines, lower_lines)
+    numbered = enumerate(pairs, start=start_idx) if line_numbers is None else zip(line_numbers, pairs)
+    for idx, (line, ll) in numbered:
+        if not prob_search(ll):
+            if token_search(ll):
+                zero_overlap += 1
+            continue
+        ltoks = tok_set(ll)
+        # Substring hits inside longer words still share no whole token; isdisjoint stops
+        # at the first shared token without building the intersection
+        if ltoks.isdisjoint(prob_tokens_all):
+            zero_overlap += 1
+            continue
+        # One intersection with the (small) combined vocabulary feeds both counters
+        # and match_tokens instead of three separate set intersections per line
+        hits = ltoks & prob_tokens_all
+        base_overlap = boost_overlap = 0
+        for t in hits:
+            if t in prob_tokens:
+                base_overlap += 1
+            if t in booster_tokens:
+                boost_overlap += 1
+        total_overlap = base_overlap + (2 * boost_overlap)
+        if reboot_mode and boost_overlap == 0 and _looks_like_config(line):
+            excluded_config += 1
+            continue
+        if reboot_mode and boost_overlap == 0 and any(p.search(line) for p in reboot_noise_patterns):
+            excluded_noise += 1
+            continue
+        total_candidates += 1
+        if total_overlap < min_total:
+            continue
+        score = total_overlap / denom
+        sentiment = None
+        if is_sentiment:
+            sentiment = 0.0
+            for t in ltoks.intersection(_SENT_KEYS):
+                sentiment += _SENT[t]
+            if sentiment < 0:
+                score *= (1 + min(0.5, abs(sentiment)))
+            if score > 1:
+                score = 1.0
+        if score < threshold:
+            continue
+        above_threshold += 1
+        if len(top) < max_lines:
+            push = heappush
+        elif top and score > top[0][0]:
+            # Lines arrive in increasing n, so an equal score never displaces a kept line
+            push = heapreplace
+        else:
+            continue
+        # Plain tuples while ranking; response dicts are built only for the final lines
+        push(top, (score, -idx, base_overlap, boost_overlap, line[:1000], hits, sentiment))
+    _tok_set.cache_clear()
+    return top, total_candidates, above_threshold, excluded_config, excluded_noise, zero_overlap
+
+
+SMART_INDEX_BLOCK_BYTES = 1024 * 1024
+# Larger logs are scanned instead: building their index costs more than a scan
+SMART_INDEX_MAX_BYTES = 32 * 1024 * 1024
+# Odd multiplier, so token hashes can be shifted to position 0 with its inverse mod 2**64
+_HASH_P = 0x100000001b3
+_HASH_P_INV = pow(_HASH_P, -1, 1 << 64)
+
+def _token_hash(token: str) -> int:
+    # sum(byte_j * P**j) mod 2**64, the same value _build_token_index computes in numpy
+    h, p = 0, 1
+    for b in token.encode('ascii'):
+        h = (h + b * p) & 0xFFFFFFFFFFFFFFFF
+        p = (p * _HASH_P) & 0xFFFFFFFFFFFFFFFF
+    return h
+
+def _hash_powers(base: int, n: int):
+    powers = np.empty(n + 1, dtype=np.uint64)
+    powers[0] = 1
+    np.cumprod(np.full(n, base, dtype=np.uint64), out=powers[1:])  # wraps mod 2**64
+    return powers
+
+def _line_blocks(buf: bytes, block: int):
+    """(start, end) byte ranges of about block bytes that end after a newline."""
+    spans = []
+    pos, n = 0, len(buf)
+    while pos < n:
+        end = min(n, pos + block)
+        if end < n:
+            # A line longer than the block extends it
+            cut = buf.rfind(b'\n', pos, end)
+            if cut < pos:
+                cut = buf.find(b'\n', end)
+            end = cut + 1 if cut >= 0 else n
+        spans.append((pos, end))
+        pos = end
+    return spans
+
+def _build_token_index(lower_buf, lf, block=SMART_INDEX_BLOCK_BYTES):
+    """Inverted index (token -> lines) of an ASCII-lowercased indexed buffer.
+
+    Returns (keys, offsets, rows, token_lines): sorted token hashes, where the 0-based
+    lines holding keys[i] are rows[offsets[i]:offsets[i + 1]] (ascending, one entry per
+    line), and the number of lines containing any token. Tokens are stored as
+    hashes; a collision can only add a line, which scoring then rejects.
+    """
+    arr = np.frombuffer(lower_buf, dtype=np.uint8)
+    spans = _line_blocks(lower_buf, block)
+    width = max((end - pos for pos, end in spans), default=0)
+    powers = _hash_powers(_HASH_P, width)
+    inverse = _hash_powers(_HASH_P_INV, width)
+    # Each block's postings are sorted and deduplicated on their own; only per-block
+    # row lists and token counts are kept, so no log-wide hash array is ever sorted
+    parts = []
+    token_lines = 0
+    for pos, end in spans:
+        blk = arr[pos:end]
+        # Token bytes of lowercased text (a-z, 0-9, _); token runs start at +1 edges
+        edges = np.zeros(len(blk) + 2, dtype=np.int8)
+        edges[1:-1] = (np.subtract(blk, 97, dtype=np.uint8) < 26) | (np.subtract(blk, 48, dtype=np.uint8) < 10) | (blk == 95)
+        edges = np.diff(edges)
+        starts = np.flatnonzero(edges == 1)
+        stops = np.flatnonzero(edges == -1)
+        if not starts.size:
+            continue
+        prefix = np.zeros(len(blk) + 1, dtype=np.uint64)
+        np.cumsum(blk * powers[:len(blk)], out=prefix[1:])
+        hashes = (prefix[stops] - prefix[starts]) * inverse[starts]
+        del edges, prefix
+        first = np.searchsorted(lf, pos)
+        lines = (np.searchsorted(lf[first:np.searchsorted(lf, end)], starts + pos) + first).astype(np.int32)
+        token_lines += int(np.count_nonzero(np.diff(lines))) + 1
+        # Occurrences arrive in line order, so a stable sort by hash leaves each posting list
+        # ascending and repeats of a token within one line adjacent, to be dropped here
+        order = np.argsort(hashes, kind='stable')
+        hashes, lines = hashes[order], lines[order]
+        new_key = np.diff(hashes, prepend=hashes[:1] + np.uint64(1)) != 0
+        keep = new_key | (np.diff(lines, prepend=np.int32(-1)) != 0)
+        hashes, lines, new_key = hashes[keep], lines[keep], new_key[keep]
+        firsts = np.flatnonzero(new_key)
+        parts.append((hashes[firsts], np.diff(np.append(firsts, len(hashes))), lines))
+    if not parts:
+        return np.empty(0, dtype=np.uint64), np.zeros(1, dtype=np.int64), np.empty(0, dtype=np.int32), 0
+    # Merge: lay out every key's postings block after block, which keeps them ascending
+    keys = np.unique(np.concatenate([p[0] for p in parts]))
+    ids = [np.searchsorted(keys, p[0]) for p in parts]
+    counts = np.zeros(len(keys), dtype=np.int64)
+    for k, (_keys, n, _lines) in zip(ids, parts):
+        counts[k] += n
+    offsets = np.zeros(len(keys) + 1, dtype=np.int64)
+    np.cumsum(counts, out=offsets[1:])
+    cursor = offsets[:-1].copy()
+    rows = np.empty(offsets[-1], dtype=np.int32)
+    for k, (_keys, n, lines) in zip(ids, parts):
+        local = np.cumsum(n) - n
+        rows[np.repeat(cursor[k] - local, n) + np.arange(len(lines))] = lines
+        cursor[k] += n
+    return keys, offsets, rows, token_lines
+
+@functools.lru_cache(maxsize=LOG_ARTIFACT_CACHE_SIZE)
+def _get_token_index(log_id: str):
+    """Token index of a cached log, built on first use.
+
+    None when the log is over SMART_INDEX_MAX_BYTES or holds characters whose
+    lowercase adds ASCII letters (see _ascii_lower); those logs are scanned line
+    by line instead.
+    """
+    buf, lf = _get_lineidx(log_id)
+    if len(buf) > SMART_INDEX_MAX_BYTES:
+        return None
+    lower_buf = _ascii_lower(buf)
+    return None if lower_buf is None else _build_token_index(lower_buf, lf)
+
+def _index_rows(index, vocab):
+    """Sorted 0-based lines that contain any of the vocab tokens."""
+    keys, offsets, rows, _token_lines = index
+    if not len(keys):
+        return []
+    want = np.array([_token_hash(t) for t in vocab], dtype=np.uint64)
+    pos = np.searchsorted(keys, want)
+    found = pos[(pos < len(keys)) & (keys[np.minimum(pos, len(keys) - 1)] == want)]
+    if not found.size:
+        return []
+    if found.size == 1:
+        return rows[offsets[found[0]]:offsets[found[0] + 1]].tolist()
+    # Posting lists are already unique; only the union across tokens needs merging
+    return np.unique(np.concatenate([rows[offsets[i]:offsets[i + 1]] for i in found])).tolist()
+
+def _decode_rows(buf, lf, rows, encoding='utf-8'):
+    """Decode the given 0-based lines of an indexed buffer, dropping a trailing CR."""
+    n_lf = len(lf)
+    for k in rows:
+        a = int(lf[k - 1]) + 1 if k else 0
+        b = int(lf[k]) if k < n_lf else len(buf)
+        line = buf[a:b].decode(encoding, 'replace')
+        yield line[:-1] if line.endswith('\r') else line
+
+def _score_indexed(buf, lf, index, prob_tokens, booster_tokens, reboot_mode, threshold, model, max_lines):
+    """_score_chunk over a cached log, reading candidate lines from its token index.
+
+    Only lines whose postings include a problem or booster token are decoded and
+    scored; every other line with tokens is counted as zero overlap in bulk.
+    """
+    rows = _index_rows(index, sorted(prob_tokens | booster_tokens))
+    top, n_cand, n_above, n_cfg, n_noise, n_zero = _score_chunk(
+        _decode_rows(buf, lf, rows), 1, prob_tokens, booster_tokens, reboot_mode, threshold, model, max_lines,
+        line_numbers=[k + 1 for k in rows])
+    n_zero += index[3] - len(rows)
+    return top, n_cand, n_above, n_cfg, n_noise, n_zero
+
+
 @app.route('/smart')
 def smart_detection_page():
     return render_template('smart_detection.html', ai_mode=AI_MODE)
@@ -813,6 +1361,7 @@ def smart_detection_page():
 def api_smart_detect():
     """Return top <=300 individual log lines matching problem description with score >= threshold.
     Input JSON: {problem_title, problem_content, log_text, threshold=0.8, max_lines=300, model=heuristic|sentiment_lexicon}
+    log_id may be sent instead of log_text to scan an uploaded log (line numbers then match /raw_log_chunk).
     heuristic: token overlap (with reboot boosters)
     sentiment_lexicon: same + negative sentiment boosting
     """
@@ -824,12 +1373,14 @@ def api_smart_detect():
         threshold = float(data.get('threshold') or 0.8)
         max_lines = int(data.get('max_lines') or 300)
         model = (data.get('model') or 'heuristic').strip()
-        if not title or not content or not log_text:
-            return jsonify({'error': 'missing_fields'}), 400
+        log_id = data.get('log_id') or ''
+        entry = None if log_text else LOG_CACHE.get(log_id)
+        if not title or not content or not (log_text or entry):
+            return _json({'error': 'missing_fields'}, 400)
 
         # Tokenize problem with stopword removal & domain detection
         def _tok(s: str):
-            return [t for t in re.split(r'[^A-Za-z0-9_]+', s.lower()) if t]
+            return _TOKEN_RE.findall(s.lower())
 
         raw_prob_tokens = _tok(title + ' ' + content)
         stop = {
@@ -837,126 +1388,79 @@ def api_smart_detect():
         }
         prob_tokens = set(t for t in raw_prob_tokens if (len(t) > 2 and t not in stop) or t in {'cpu','ram','io'})
         if not prob_tokens:
-            return jsonify({'error': 'no_tokens'}), 400
+            return _json({'error': 'no_tokens'}, 400)
 
         text_lower = (title + ' ' + content).lower()
         reboot_mode = any(k in text_lower for k in ['reboot','restart','bootloop','boot loop','boot-loop','watchdog'])
         reboot_tokens = {'reboot','boot','booting','restarting','restart','watchdog','panic','kernel','shutdown','power','cold','warm','uptime','crash','crashing'}
         booster_tokens = reboot_tokens if reboot_mode else set()
-        prob_tokens_all = prob_tokens | booster_tokens
-
-        lines = log_text.splitlines()
-        generic_config_patterns = [
-            re.compile(r'^[A-Z][A-Za-z0-9_-]{1,32}:\s*$'),
-            re.compile(r'^(KeyMgmt|PairwiseCiphers|GroupCiphers|Protocols|AuthAlgorithms)\b', re.IGNORECASE),
-        ]
-        reboot_noise_patterns = []
-        if reboot_mode:
-            reboot_noise_patterns = [
-                re.compile(r'ContentProviderRecord', re.IGNORECASE),
-                re.compile(r'^\s*Client:\s*$', re.IGNORECASE),
-                re.compile(r'nothing to dump', re.IGNORECASE),
-            ]
-
-        def looks_like_config(line: str) -> bool:
-            stripped = line.strip()
-            if not stripped:
-                return False
-            if any(p.search(stripped) for p in generic_config_patterns):
-                return True
-            if ':' in stripped and len(stripped.split()) <= 6 and len(stripped) < 80:
-                key = stripped.split(':',1)[0]
-                if len(key) < 25 and key.isalpha():
-                    return True
-            return False
-
-        excluded_config = 0
-        zero_overlap = 0
-        excluded_noise = 0
-
-        # Sentiment lexicon (simple) for optional boosting
-        if model == 'sentiment_lexicon':
-            negative_terms = {
-                'fail': -0.9,'failed': -1.0,'failure': -1.0,'crash': -1.0,'crashes': -1.0,'fatal': -1.0,'error': -0.8,'exception': -0.85,
-                'anr': -0.9,'timeout': -0.7,'watchdog': -0.8,'panic': -1.0,'reset': -0.6,'reboot': -0.6,'overheat': -0.7,
-                'denied': -0.5,'reject': -0.6,'corrupt': -0.9,'oom': -1.0,'leak': -0.7,'stuck': -0.6,'hang': -0.7
-            }
-            positive_terms = {'success': 0.4,'ok':0.2,'started':0.1,'initialized':0.15,'connected':0.2,'recovered':0.3,'resume':0.1}
-            def sentiment_score(tokens):
-                sc = 0.0
-                for t in tokens:
-                    if t in negative_terms:
-                        sc += negative_terms[t]
-                    elif t in positive_terms:
-                        sc += positive_terms[t]
-                return sc
+        if entry is not None:
+            # Cached uploads are read through the shared newline index, decoding lazily
+            buf, lf = _get_lineidx(log_id)
+            n_lines = _line_count(buf, lf)
+            line_range = functools.partial(_iter_lines, buf, lf)
+            all_lines = line_range()
+            index = _get_token_index(log_id) if np is not None else None
+            # Without an index, lowercase the whole buffer once and slice lines from both copies
+            lower_buf = None if index is not None else _ascii_lower(buf)
+            lower_range = None if lower_buf is None else functools.partial(_iter_lines, lower_buf, lf, encoding='ascii')
         else:
-            def sentiment_score(_tokens):
-                return 0.0
-
-        candidates = []
-        for idx, line in enumerate(lines, start=1):
-            ltoks = set(_tok(line))
-            if not ltoks:
-                continue
-            base_overlap = len(prob_tokens & ltoks)
-            boost_overlap = len(booster_tokens & ltoks) if booster_tokens else 0
-            total_overlap = base_overlap + (2 * boost_overlap)
-            if total_overlap == 0:
-                zero_overlap += 1
-                continue
-            if reboot_mode and boost_overlap == 0 and looks_like_config(line):
-                excluded_config += 1
-                continue
-            if reboot_mode and boost_overlap == 0 and any(p.search(line) for p in reboot_noise_patterns):
-                excluded_noise += 1
-                continue
-            denom = len(prob_tokens_all) + 1e-6
-            score = total_overlap / denom
-            sentiment = None
-            if model == 'sentiment_lexicon':
-                sentiment = sentiment_score(ltoks)
-                if sentiment < 0:
-                    score *= (1 + min(0.5, abs(sentiment)))
-                if score > 1:
-                    score = 1.0
-            match_tokens = sorted(prob_tokens_all & ltoks)
-            candidates.append({
-                'n': idx,
-                'score': score,
-                'text': line[:1000],
-                'base_overlap': base_overlap,
-                'booster_overlap': boost_overlap,
-                'match_tokens': match_tokens,
-                'sentiment': sentiment
-            })
-
-        candidates.sort(key=lambda d: (-d['score'], d['n']))
-        filtered = []
-        for c in candidates:
-            if c['score'] >= threshold:
-                filtered.append({
-                    'n': c['n'],
-                    'score': round(c['score'], 4),
-                    'text': c['text'],
-                    'base_overlap': c['base_overlap'],
-                    'booster_overlap': c['booster_overlap'],
-                    'match_tokens': c['match_tokens'],
-                    'sentiment': c.get('sentiment')
-                })
-        truncated = False
-        if len(filtered) > max_lines:
-            filtered = filtered[:max_lines]
-            truncated = True
-
-        return jsonify({
+            lines = log_text.splitlines()
+            n_lines = len(lines)
+            line_range = lambda a, b: lines[a:b]
+            all_lines = lines
+            index = lower_range = None
+        workers = min(SMART_DETECT_WORKERS, n_lines // 1000 or 1)
+        parts = None
+        if index is not None:
+            parts = [_score_indexed(buf, lf, index, prob_tokens, booster_tokens, reboot_mode, threshold, model,
+                                    max_lines)]
+        elif _SMART_POOL is not None and workers > 1 and n_lines >= SMART_DETECT_PARALLEL_MIN_LINES:
+            # Scoring holds the GIL, so large logs are split into contiguous line ranges and
+            # scored in the worker pool; partial candidate lists and counters are merged below
+            size = -(-n_lines // workers)
+            starts = range(0, n_lines, size)
+            args = (prob_tokens, booster_tokens, reboot_mode, threshold, model, max_lines)
+            try:
+                parts = list(_SMART_POOL.map(_score_chunk, [list(line_range(s, s + size)) for s in starts],
+                                             [s + 1 for s in starts], *(repeat(v, len(starts)) for v in args),
+                                             [list(lower_range(s, s + size)) if lower_range else None
+                                              for s in starts]))
+            except BrokenProcessPool:
+                logger.warning('smart_detect worker pool broken; scoring serially')
+        if parts is None:
+            parts = [_score_chunk(all_lines, 1, prob_tokens, booster_tokens, reboot_mode, threshold, model, max_lines,
+                                  lower_range() if lower_range else None)]
+        top = []
+        total_candidates = above_threshold = excluded_config = excluded_noise = zero_overlap = 0
+        for part_top, n_cand, n_above, n_cfg, n_noise, n_zero in parts:
+            top.extend(part_top)
+            total_candidates += n_cand
+            above_threshold += n_above
+            excluded_config += n_cfg
+            excluded_noise += n_noise
+            zero_overlap += n_zero
+
+        # (score, -n) keys are unique, so nlargest yields the (-score, n) order directly
+        filtered = [{
+            'n': -neg_n,
+            'score': round(score, 4),
+            'text': text,
+            'base_overlap': base_overlap,
+            'booster_overlap': boost_overlap,
+            'match_tokens': sorted(hits),
+            'sentiment': sentiment
+        } for score, neg_n, base_overlap, boost_overlap, text, hits, sentiment in heapq.nlargest(max_lines, top)]
+        truncated = above_threshold > max_lines
+
+        return _json({
             'problem': title,
             'threshold': threshold,
             'returned_count': len(filtered),
             'max_lines': max_lines,
-            'total_lines_scanned': len(lines),
-            'total_candidates': len(candidates),
-            'above_threshold_count': sum(1 for c in candidates if c['score'] >= threshold),
+            'total_lines_scanned': n_lines,
+            'total_candidates': total_candidates,
+            'above_threshold_count': above_threshold,
             'truncated': truncated,
             'reboot_mode': reboot_mode,
             'problem_tokens': sorted(prob_tokens),
@@ -969,7 +1473,7 @@ def api_smart_detect():
         })
     except Exception as e:
         logger.exception('smart_detect error')
-        return jsonify({'error': 'internal', 'detail': str(e)}), 500
+        return _json({'error': 'internal', 'detail': str(e)}, 500)
 
 @app.route('/generate_overview', methods=['POST'])
 def generate_overview():
@@ -980,16 +1484,22 @@ def generate_overview():
         data = request.get_json() or {}
         log_id = data.get('log_id')
         if not log_id:
-            return jsonify({'error': 'log_id required'}), 400
+            return _json({'error': 'log_id required'}, 400)
         entry = LOG_CACHE.get(log_id)
         if not entry:
-            return jsonify({'error': 'Log not found'}), 404
+            return _json({'error': 'Log not found'}, 404)
         # If already eager or caches exist, just return existing (respecting new lazy suppression policy)
         log_text = entry['log']
         # Build caches
         if 'raw_log_preview_cache' not in entry:
-            raw_lines = log_text.splitlines()
-            entry['raw_log_preview_cache'] = '\n'.join(f"{i+1:6d} | {ln}" for i, ln in enumerate(raw_lines))
+            # Append numbered lines into one buffer rather than joining an f-string per line
+            out = io.StringIO()
+            write = out.write
+            for i, ln in enumerate(log_text.splitlines(), 1):
+                write('%6d | %s\n' % (i, ln))
+            if out.tell():
+                out.truncate(out.tell() - 1)  # no trailing newline, as with '\n'.join
+            entry['raw_log_preview_cache'] = out.getvalue()
         if 'summary_cache' not in entry:
             try:
                 entry['summary_cache'] = LogAnalyzer.extract_summary_sections(log_text)
@@ -1000,7 +1510,7 @@ def generate_overview():
                 entry['preview_cache'] = LogAnalyzer.generate_preview(log_text)
             except Exception:
                 entry['preview_cache'] = 'Failed to generate custom preview.'
-        return jsonify({
+        return _json({
             'log_id': log_id,
             'summary': entry.get('summary_cache',''),
             'preview_log': entry.get('preview_cache',''),
@@ -1008,7 +1518,7 @@ def generate_overview():
         })
     except Exception as e:
         logger.error(f"generate_overview error: {e}")
-        return jsonify({'error': str(e)}), 500
+        return _json({'error': str(e)}, 500)
 
 @app.route('/compare_issues', methods=['POST'])
 def compare_issues():
@@ -1020,24 +1530,25 @@ def compare_issues():
     b_main = data.get('b_main')
     b_sub = data.get('b_sub')
     if not all([log_id, a_main, a_sub, b_main, b_sub]):
-        return jsonify({'error': 'Missing parameters'}), 400
+        return _json({'error': 'Missing parameters'}, 400)
     entry = LOG_CACHE.get(log_id)
     if not entry:
-        return jsonify({'error': 'Log ID not found'}), 404
+        return _json({'error': 'Log ID not found'}, 404)
     a = _ensure_analysis(log_id, a_main, a_sub)
     b = _ensure_analysis(log_id, b_main, b_sub)
-    # Build simple signature sets (line_number + first 40 chars of matched_line)
+    # Build simple signature sets (line_number + first 40 chars of matched_line); cached
+    # analyses never change, so the set is memoized on the result for later comparisons
     def sig_set(res):
-        out=set()
-        for rl in res.get('relevant_logs', []):
-            ln = rl.get('line_number')
-            ml = (rl.get('matched_line') or '')[:40]
-            out.add((ln, ml))
+        out = res.get('_sig_set')
+        if out is None:
+            out = frozenset((rl.get('line_number'), (rl.get('matched_line') or '')[:40])
+                            for rl in res.get('relevant_logs', []))
+            res['_sig_set'] = out
         return out
     set_a = sig_set(a)
     set_b = sig_set(b)
     intersection = set_a & set_b
-    return jsonify({
+    return _json({
         'a': {'main': a_main, 'sub': a_sub, 'count': len(set_a)},
         'b': {'main': b_main, 'sub': b_sub, 'count': len(set_b)},
         'intersection_count': len(intersection),
@@ -1045,14 +1556,21 @@ def compare_issues():
         'b_only': len(set_b - set_a)
     })
 
+RAW_LOG_CHUNK_BYTES = 1024 * 1024
+
+def _iter_bytes(buf: bytes, chunk: int = RAW_LOG_CHUNK_BYTES):
+    # Stream the cached encoded log in fixed slices instead of handing WSGI one huge body
+    for i in range(0, len(buf), chunk):
+        yield buf[i:i + chunk]
+
 @app.route('/raw_log/<log_id>')
 def raw_log(log_id):
     """Return the full raw log as plain text for viewing/downloading."""
     entry = LOG_CACHE.get(log_id)
     if not entry:
         return 'Log not found or expired', 404
-    from flask import Response
-    return Response(entry['log'], mimetype='text/plain')
+    buf, _lf = _get_lineidx(log_id)
+    return Response(_iter_bytes(buf), mimetype='text/plain', headers={'Content-Length': str(len(buf))})
 
 @app.route('/raw_log_chunk')
 def raw_log_chunk():
@@ -1064,26 +1582,25 @@ def raw_log_chunk():
         start = int(request.args.get('start', '1'))
         limit = int(request.args.get('limit', '1000'))
     except ValueError:
-        return jsonify({'error': 'Invalid start/limit'}), 400
+        return _json({'error': 'Invalid start/limit'}, 400)
     if limit <= 0 or limit > 20000:
         limit = 1000
     if start <= 0:
         start = 1
     entry = LOG_CACHE.get(log_id)
     if not entry:
-        return jsonify({'error': 'Log not found'}), 404
-    if 'log_lines' not in entry:
-        entry['log_lines'] = entry['log'].splitlines()
-    lines = entry['log_lines']
-    total = len(lines)
+        return _json({'error': 'Log not found'}, 404)
+    buf, lf = _get_lineidx(log_id)
+    total = _line_count(buf, lf)
     if start > total:
-        return jsonify({'log_id': log_id, 'start': start, 'limit': limit, 'lines': [], 'has_more': False, 'total_lines': total})
+        return _json({'log_id': log_id, 'start': start, 'limit': limit, 'lines': [], 'has_more': False, 'total_lines': total})
     end = min(total, start + limit - 1)
-    slice_lines = lines[start-1:end]
+    # Decode only the requested window of the byte buffer
+    slice_lines = _iter_lines(buf, lf, start - 1, end)
     out_lines = [{'n': i, 't': txt} for i, txt in zip(range(start, end+1), slice_lines)]
     has_more = end < total
     next_start = end + 1 if has_more else None
-    return jsonify({
+    return _json({
         'log_id': log_id,
         'start': start,
         'limit': limit,
@@ -1098,15 +1615,29 @@ def ai_status():
     """Lightweight status endpoint describing AI mode and availability.
     Returns JSON: {ai_mode: bool, advanced_duplicate_available: bool, translator_available: bool}
     """
-    return jsonify({
+    return _json({
         'ai_mode': AI_MODE,
         'advanced_duplicate_available': AdvancedDuplicateFinder is not None,
         'translator_available': SimpleTranslator is not None
     })
 
+def _start_smart_pool():
+    """Fork the smart_detect workers once, before the server starts any thread; forking
+    later from a request thread could copy locks held by other threads into the child.
+    Every large request then reuses these workers. Returns None when disabled."""
+    if _FORK_CTX is None or SMART_DETECT_WORKERS < 2:
+        return None
+    pool = ProcessPoolExecutor(max_workers=SMART_DETECT_WORKERS, mp_context=_FORK_CTX)
+    pool.submit(int).result()  # fork pools start every worker on the first submit
+    return pool
+
 if __name__ == '__main__':
     debug_flag = os.environ.get('PLM_DEBUG', '0') == '1'
     if AI_MODE and AdvancedDuplicateFinder is None:
         logger.warning('AI mode requested but advanced_duplicate_finder dependencies not available. Falling back to lightweight mode.')
+    _SMART_POOL = _start_smart_pool()
+    if SimpleTranslator is not None and os.environ.get('PLM_TRANSLATOR_MODEL'):
+        # Pay the model load + warmup at boot rather than on the first Translate request
+        _get_translator().warmup()
     # Disable reloader to reduce connection refusals during code changes
     app.run(debug=debug_flag, use_reloader=False, host='0.0.0.0', port=5000)
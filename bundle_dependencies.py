@@ -9,6 +9,7 @@ import os
 import sys
 import subprocess
 import shutil
+import tempfile
 from pathlib import Path
 
 def run_command(command, description):
@@ -34,7 +35,6 @@ def create_directories():
         'libs/itsdangerous',
         'libs/click',
         'libs/blinker',
-        'libs/click',
         'libs/typing_extensions',
         'libs/importlib_metadata',
         'libs/zipp',
@@ -51,20 +51,6 @@ def create_directories():
         'libs/colorama',
         'libs/distlib',
         'libs/filelock',
-        'libs/platformdirs',
-        'libs/packaging',
-        'libs/pyparsing',
-        'libs/setuptools',
-        'libs/wheel',
-        'libs/pip',
-        'libs/requests',
-        'libs/urllib3',
-        'libs/certifi',
-        'libs/charset_normalizer',
-        'libs/idna',
-        'libs/colorama',
-        'libs/distlib',
-        'libs/filelock',
         'libs/platformdirs'
     ]
     
@@ -92,11 +78,15 @@ def download_dependencies():
         'pip==23.2.1'
     ]
     
-    for dep in dependencies:
-        print(f"📦 Downloading {dep}...")
-        if not run_command(f"pip download {dep} -d libs/", f"Download {dep}"):
-            print(f"⚠️  Warning: Failed to download {dep}")
-            continue
+    # One pip invocation resolves the whole set at once instead of one process per package;
+    # note a single unresolvable pin now fails the whole download
+    with tempfile.NamedTemporaryFile('w', suffix='.txt', delete=False) as f:
+        f.write('\n'.join(dependencies) + '\n')
+    print(f"📦 Downloading {len(dependencies)} packages...")
+    try:
+        return run_command(f'"{sys.executable}" -m pip download -r "{f.name}" -d libs/', "Download all dependencies")
+    finally:
+        os.remove(f.name)
 
 def create_offline_installer():
     """Create an offline installer script"""
@@ -0,0 +1,38 @@
+"""Convert a Hugging Face MarianMT (OPUS-MT) model for offline translation.
+
+Run on an online machine (needs ctranslate2 + transformers + sentencepiece):
+    python scripts/convert_translation_model.py --model Helsinki-NLP/opus-mt-de-en --output-dir models/de-en
+
+Then point the app at the result:
+    PLM_TRANSLATOR_MODEL=models/de-en python app.py
+
+The output is a CTranslate2 model with int8 weights plus the SentencePiece
+source.spm / target.spm files that translator/simple_translator.py loads.
+"""
+from __future__ import annotations
+import argparse
+from pathlib import Path
+
+SPM_FILES = ['source.spm', 'target.spm']
+
+
+def convert(model_id: str, output_dir: Path, quantization: str, force: bool):
+    from ctranslate2.converters import TransformersConverter
+    print(f'Converting {model_id} -> {output_dir} ({quantization}) ...')
+    converter = TransformersConverter(model_id, copy_files=SPM_FILES)
+    converter.convert(str(output_dir), quantization=quantization, force=force)
+    print('Model converted.')
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument('--model', required=True, help='Hugging Face MarianMT model ID, e.g. Helsinki-NLP/opus-mt-de-en')
+    ap.add_argument('--output-dir', required=True, help='Target directory for the converted model')
+    ap.add_argument('--quantization', default='int8', help='Weight type: int8, int8_float16, float16 or float32')
+    ap.add_argument('--force', action='store_true', help='Overwrite an existing output directory')
+    args = ap.parse_args()
+    convert(args.model, Path(args.output_dir), args.quantization, args.force)
+
+
+if __name__ == '__main__':
+    main()
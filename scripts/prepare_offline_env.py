@@ -30,8 +30,7 @@ def download_wheels(download_dir: Path, req_file: str):
     if not Path(req_file).is_file():
         print(f'Skip {req_file} (missing)')
         return
-    run([sys.executable, '-m', 'pip', 'download', '-r', req_file, '-d', str(download_dir), '--no-deps'])
-    # Then download dependencies recursively for completeness
+    # A full (recursive) download already includes every pinned requirement
     run([sys.executable, '-m', 'pip', 'download', '-r', req_file, '-d', str(download_dir)])
 
 def download_model(download_dir: Path, model_id: str):
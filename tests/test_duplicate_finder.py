@@ -44,3 +44,64 @@ def test_cache_stats_structure():
         assert stats['embedding_cache_hit'] in (True, False)
     finally:
         os.remove(path)
+
+
+def test_tfidf_fallback_finder_ranks_closest_issue():
+    from app import DuplicateFinder
+    rows = [
+        {"title": "Camera crash", "content": "App crashes switching to front camera"},
+        {"title": "Battery drain", "content": "High battery usage overnight"},
+        {"title": "Camera freeze", "content": "Camera preview freezes on launch"},
+    ]
+    for ordered in (rows, rows[::-1]):
+        path = _make_csv(ordered)
+        try:
+            finder = DuplicateFinder(path)
+            sims = finder.find_duplicates("Camera crash", "crashes when switching to front camera", threshold=0, max_results=3)
+            assert sims[0]['issue']['title'] == 'Camera crash'
+            assert sims[0]['similarity'] > max(s['similarity'] for s in sims[1:])
+            assert all(0 <= s['similarity'] <= 100 for s in sims)
+            assert finder.find_duplicates("Battery drain", "", threshold=101) == []
+        finally:
+            os.remove(path)
+
+
+def test_duplicate_finder_form_threshold_follows_mode(monkeypatch):
+    import app as app_module
+    client = app_module.app.test_client()
+    monkeypatch.setattr(app_module, 'AI_MODE', False)
+    page = client.get('/duplicate-finder').get_data(as_text=True)
+    assert 'value="40"' in page and 'checked disabled' not in page
+    # AI mode forces the semantic finder, so the form starts on its 80% scale
+    monkeypatch.setattr(app_module, 'AI_MODE', True)
+    monkeypatch.setattr(app_module, 'AdvancedDuplicateFinder', object)
+    page = client.get('/duplicate-finder').get_data(as_text=True)
+    assert 'value="80"' in page and 'checked disabled' in page
+
+
+def test_difflib_length_window_matches_full_scan(monkeypatch):
+    import difflib
+    import random
+    import app as app_module
+    monkeypatch.setattr(app_module, 'TfidfVectorizer', None)
+    rnd = random.Random(7)
+    # 'a' * n against a base of 30 'a's scores exactly t at both window ends for
+    # t = 0.5 (n = 10, 90) and t = 0.8 (n = 20, 45)
+    titles = ['a' * n for n in range(1, 100)]
+    titles += [''.join(rnd.choice('ab c') for _ in range(rnd.randint(1, 80))) for _ in range(200)]
+    path = _make_csv([{'title': t, 'content': ''} for t in titles])
+    try:
+        finder = app_module.DuplicateFinder(path)
+        assert finder._vec is None
+        for base in ('a' * 30, 'ab ca' * 6):
+            for threshold in (0, 1, 50, 80, 99, 100, 200):
+                full = []
+                for issue in finder.issues:
+                    cand = (issue['title'] + ' ' + issue['content']).strip().lower()
+                    ratio = difflib.SequenceMatcher(None, base, cand).ratio() * 100
+                    if cand and ratio >= threshold:
+                        full.append({'issue': issue, 'similarity': round(ratio, 2)})
+                full.sort(key=lambda x: x['similarity'], reverse=True)
+                assert finder.find_duplicates(base, '', threshold, max_results=len(titles)) == full
+    finally:
+        os.remove(path)
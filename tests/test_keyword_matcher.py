@@ -0,0 +1,31 @@
+import pytest
+
+import analyzers.keyword_matcher as km
+
+
+@pytest.fixture(params=[True, False], ids=['ahocorasick', 'regex'])
+def backend(request, monkeypatch):
+    if request.param and not km._AC_AVAILABLE:
+        pytest.skip('pyahocorasick not installed')
+    monkeypatch.setattr(km, '_AC_AVAILABLE', request.param)
+    return request.param
+
+
+def test_keyword_matcher_backends_agree(backend):
+    m = km.KeywordMatcher(['panic', 'kernel', 'kernel panic', '', 'panic'])
+    assert (m._automaton is not None) is backend
+    assert m.keywords == ('panic', 'kernel', 'kernel panic')
+    assert m.search('e watchdog: kernel panic') is True
+    assert m.search('nothing here') is False
+    assert m.found('kernel panic, kernel') == {'panic', 'kernel', 'kernel panic'}
+    assert m.found('xyz') == set()
+    assert m.first('kernel panic') == 'panic'
+    assert m.first('kernel only') == 'kernel'
+    assert m.first('none') is None
+
+
+def test_empty_keyword_set_matches_nothing(backend):
+    m = km.KeywordMatcher([])
+    assert m.search('anything') is False
+    assert m.found('anything') == set()
+    assert m.first('anything') is None
@@ -0,0 +1,151 @@
+from app import app, LOG_CACHE, _clear_log_artifacts
+
+
+def _detect(**payload):
+    return app.test_client().post('/api/smart_detect', json=payload).get_json()
+
+
+LOG = '\n'.join([
+    'I Choreographer: Skipped 30 frames',
+    'E Watchdog: kernel panic, rebooting device',
+    'KeyMgmt: WPA-PSK',
+    'Status:',
+    'W ActivityManager: ContentProviderRecord camera',
+    'E Watchdog: watchdog reset',
+    'Camera: enabled',
+    '',
+])
+
+
+def test_smart_detect_scores_and_exclusions():
+    res = _detect(problem_title='Device reboot', problem_content='Phone reboots with kernel panic camera',
+                  log_text=LOG, threshold=0.01, max_lines=10)
+    assert res['reboot_mode'] is True
+    assert [ln['n'] for ln in res['lines']] == [2, 6]
+    assert res['lines'][0]['score'] == round(8 / 18, 4)
+    assert res['lines'][0]['match_tokens'] == ['kernel', 'panic', 'watchdog']
+    assert res['zero_overlap'] == 3
+    assert res['excluded_config'] == 1
+    assert res['excluded_noise'] == 1
+    assert res['above_threshold_count'] == 2
+    assert res['truncated'] is False
+
+
+def test_smart_detect_threshold_and_truncation():
+    res = _detect(problem_title='Device reboot', problem_content='Phone reboots with kernel panic camera',
+                  log_text=LOG, threshold=0.01, max_lines=1)
+    assert [ln['n'] for ln in res['lines']] == [2]
+    assert res['truncated'] is True
+    res = _detect(problem_title='Device reboot', problem_content='Phone reboots with kernel panic camera',
+                  log_text=LOG, threshold=0.2, max_lines=10)
+    assert [ln['n'] for ln in res['lines']] == [2]
+    assert res['above_threshold_count'] == 1
+
+
+def test_smart_detect_reads_cached_log_by_id():
+    log_id = 'f' * 32
+    LOG_CACHE[log_id] = {'log': LOG.replace('\n', '\r\n'), 'package_name': None, 'created': 0,
+                         'analyses': {}, 'eager_mode': False}
+    _clear_log_artifacts()  # line/token indexes are cached by log id
+    try:
+        by_id = _detect(problem_title='Device reboot', problem_content='Phone reboots with kernel panic camera',
+                        log_id=log_id, threshold=0.01, max_lines=10)
+        by_text = _detect(problem_title='Device reboot', problem_content='Phone reboots with kernel panic camera',
+                          log_text=LOG, threshold=0.01, max_lines=10)
+        assert by_id == by_text
+        chunk = app.test_client().get(f'/raw_log_chunk?log_id={log_id}&start=2&limit=2').get_json()
+        assert [ln['t'] for ln in chunk['lines']] == LOG.splitlines()[1:3]
+        assert chunk['total_lines'] == 7
+    finally:
+        LOG_CACHE.pop(log_id, None)
+        _clear_log_artifacts()
+
+
+def test_smart_detect_parallel_path_matches_serial(monkeypatch):
+    import multiprocessing
+    from concurrent.futures import ProcessPoolExecutor
+    import pytest
+    import app as app_module
+    if 'fork' not in multiprocessing.get_all_start_methods():
+        pytest.skip('fork start method not available')
+    big = '\n'.join(LOG.splitlines() * 600)  # 4200 lines -> 4 chunks below
+    payload = dict(problem_title='Device reboot', problem_content='Phone reboots with kernel panic camera',
+                   log_text=big, threshold=0.01, max_lines=50)
+    monkeypatch.setattr(app_module, '_SMART_POOL', None)
+    serial = _detect(**payload)
+    pool = ProcessPoolExecutor(max_workers=2, mp_context=multiprocessing.get_context('fork'))
+    try:
+        monkeypatch.setattr(app_module, '_SMART_POOL', pool)
+        monkeypatch.setattr(app_module, 'SMART_DETECT_WORKERS', 4)
+        monkeypatch.setattr(app_module, 'SMART_DETECT_PARALLEL_MIN_LINES', 1)
+        parallel = _detect(**payload)
+    finally:
+        pool.shutdown()
+    assert parallel == serial
+    assert serial['above_threshold_count'] == 1200 and serial['truncated'] is True
+
+
+def test_token_index_blocks_match_naive_postings():
+    import re
+    import numpy as np
+    from app import _build_token_index, _index_rows
+    lines = ['kernel panic kernel', '', 'x' * 40 + ' watchdog_1 ' + 'y' * 30, 'Watchdog: kernel',
+             'a1 b2', 'panic', 'kernel ' * 12, 'tail']
+    buf = '\r\n'.join(lines[:3]).encode() + b'\n' + '\n'.join(lines[3:]).lower().encode()
+    lf = np.flatnonzero(np.frombuffer(buf, dtype=np.uint8) == 10)
+    naive = {}
+    for row, line in enumerate(buf.decode().split('\n')):
+        for tok in re.findall(r'[a-z0-9_]+', line):
+            naive.setdefault(tok, set()).add(row)
+    # Blocks far smaller than the long lines, plus the single-block case
+    for block in (8, 16, 1 << 20):
+        index = _build_token_index(buf, lf, block)
+        keys, offsets, rows, token_lines = index
+        assert len(keys) == len(naive)
+        assert token_lines == len({r for s in naive.values() for r in s})
+        for i in range(len(keys)):
+            posting = rows[offsets[i]:offsets[i + 1]].tolist()
+            assert posting == sorted(set(posting))  # ascending, one entry per line
+        for tok, want in naive.items():
+            assert _index_rows(index, [tok]) == sorted(want)
+        assert _index_rows(index, ['kernel', 'panic']) == sorted(naive['kernel'] | naive['panic'])
+        assert _index_rows(index, ['missing']) == []
+
+
+
+def test_large_cached_log_skips_token_index(monkeypatch):
+    import app as app_module
+    log_id = 'd' * 32
+    LOG_CACHE[log_id] = {'log': LOG, 'package_name': None, 'created': 0, 'analyses': {}, 'eager_mode': False}
+    payload = dict(problem_title='Device reboot', problem_content='Phone reboots with kernel panic camera',
+                   threshold=0.01, max_lines=10)
+    _clear_log_artifacts()
+    try:
+        assert app_module._get_token_index(log_id) is not None
+        indexed = _detect(log_id=log_id, **payload)
+        _clear_log_artifacts()
+        monkeypatch.setattr(app_module, 'SMART_INDEX_MAX_BYTES', len(LOG) - 1)
+        assert app_module._get_token_index(log_id) is None
+        assert _detect(log_id=log_id, **payload) == indexed
+    finally:
+        LOG_CACHE.pop(log_id, None)
+        _clear_log_artifacts()
+
+def test_cached_log_line_numbers_follow_splitlines():
+    log_id = 'e' * 32
+    log = ('a line\rE Watchdog: kernel panic\x0cnext\u2028E Watchdog: reset\r\n'
+           'x\x0by\x1cz\x85w\u2029E kernel panic tail\n\n')
+    LOG_CACHE[log_id] = {'log': log, 'package_name': None, 'created': 0, 'analyses': {}, 'eager_mode': False}
+    _clear_log_artifacts()
+    try:
+        chunk = app.test_client().get(f'/raw_log_chunk?log_id={log_id}&start=1&limit=50').get_json()
+        assert chunk['total_lines'] == len(log.splitlines())
+        assert [ln['t'] for ln in chunk['lines']] == log.splitlines()
+        payload = dict(problem_title='Device reboot', problem_content='Phone reboots with kernel panic',
+                       threshold=0.01, max_lines=10)
+        by_id = _detect(log_id=log_id, **payload)
+        assert by_id == _detect(log_text=log, **payload)
+        assert sorted(ln['n'] for ln in by_id['lines']) == [2, 4, 9]
+    finally:
+        LOG_CACHE.pop(log_id, None)
+        _clear_log_artifacts()
@@ -0,0 +1,146 @@
+from types import SimpleNamespace
+
+import pytest
+
+from translator.simple_translator import SimpleTranslator
+
+
+class _FakePieces:
+    def encode(self, text, out_type=str):
+        return text.split()
+
+    def decode(self, pieces):
+        return ' '.join(pieces)
+
+
+class _FakeCT2:
+    def __init__(self):
+        self.calls = []
+
+    def translate_batch(self, batch, **kwargs):
+        self.calls.append(batch)
+        return [SimpleNamespace(hypotheses=[[p.upper() for p in pieces]]) for pieces in batch]
+
+
+def _translator():
+    t = SimpleTranslator(enable_translation=False)
+    t.enable_translation = True
+    t.engine = 'ctranslate2'
+    t._translator = _FakeCT2()
+    t._sp_source = t._sp_target = _FakePieces()
+    t._model_langs = ('fr', 'en')
+    return t
+
+
+def test_translate_many_batches_misses_and_keeps_order():
+    t = _translator()
+    t.translate('bonjour', source_lang='fr')
+    res = t.translate_many(['un deux trois', 'bonjour', '  ', 'quatre'], source_lang='fr')
+    assert [r.translated_text for r in res] == ['UN DEUX TROIS', 'BONJOUR', '(empty input)', 'QUATRE']
+    assert res[1].meta['cache'] == 'hit'
+    assert res[0].meta == {'engine': 'ctranslate2', 'cache': 'miss'}
+    # One engine call for the warm-up translate, one for both misses of the batch
+    assert len(t._translator.calls) == 2
+    assert sorted(map(tuple, t._translator.calls[1])) == [('quatre',), ('un', 'deux', 'trois')]
+
+
+def test_ct2_only_serves_its_language_pair(monkeypatch):
+    import translator.simple_translator as st
+    t = _translator()
+    t._fallback = SimpleNamespace(translate=lambda text: 'google:' + text)
+    res = [t.translate('bonjour', source_lang='fr'), t.translate('guten tag', source_lang='de')]
+    assert res[0].meta['engine'] == 'ctranslate2' and res[0].translated_text == 'BONJOUR'
+    assert res[1].meta['engine'] == 'deep_translator' and res[1].translated_text == 'google:guten tag'
+    t._fallback = None
+    assert t.translate('hallo welt', source_lang='de').meta['engine'] == 'stub'
+    # A model whose pair does not produce target_lang is not used at all
+    monkeypatch.setattr(st, '_CT2_AVAILABLE', True)
+    monkeypatch.setattr(st, '_DT_AVAILABLE', False)
+    assert st.SimpleTranslator(target_lang='fr', model_dir='models/de-en').engine == 'stub'
+    assert st.SimpleTranslator(target_lang='en', model_dir='models/opus-mt-de-en')._model_langs == ('de', 'en')
+    assert st.SimpleTranslator(target_lang='en', model_dir='models/x', model_langs='zh:en').engine == 'ctranslate2'
+
+
+def test_same_language_input_skips_engine():
+    t = _translator()
+    res = t.translate('already english', source_lang='en-US')
+    assert res.translated_text == 'already english'
+    assert res.meta == {'engine': 'skip-same-lang'}
+    assert t.translate('already english', source_lang='EN').meta == {'engine': 'skip-same-lang'}
+    assert t._translator.calls == []
+    t.skip_same_lang = False
+    t._model_langs = ('en', 'en')  # retranslation needs an en->en model
+    assert t.translate('already english', source_lang='en').translated_text == 'ALREADY ENGLISH'
+
+
+def test_long_input_is_translated_per_sentence():
+    t = _translator()
+    res = t.translate('Un deux. Trois!  Quatre\n\ncinq ?', source_lang='fr')
+    assert res.translated_text == 'UN DEUX. TROIS! QUATRE\n\nCINQ ?'
+    assert sorted(map(tuple, t._translator.calls[0])) == [('Quatre',), ('Trois!',), ('Un', 'deux.'), ('cinq', '?')]
+
+
+def test_vllm_engine_generates_all_prompts_at_once(monkeypatch):
+    import translator.simple_translator as st
+
+    class _FakeLLM:
+        def __init__(self):
+            self.prompts = []
+
+        def generate(self, prompts, params):
+            self.prompts.append(prompts)
+            return [SimpleNamespace(outputs=[SimpleNamespace(text=' T%d ' % i)]) for i in range(len(prompts))]
+
+    llm = _FakeLLM()
+    monkeypatch.setattr(st, '_VLLM_AVAILABLE', True)
+    monkeypatch.setattr(st, 'SamplingParams', lambda **kw: kw)
+    monkeypatch.setattr(st, '_get_llm', lambda model: llm)
+    t = st.SimpleTranslator(llm_model='some/llm')
+    res = t.translate_many(['eins', 'zwei'], source_lang='de')
+    assert [r.translated_text for r in res] == ['T0', 'T1']
+    assert res[0].meta == {'engine': 'vllm', 'cache': 'miss'}
+    assert len(llm.prompts) == 1 and 'zwei' in llm.prompts[0][1]
+
+
+def test_cache_hit_returns_shared_result():
+    t = _translator()
+    first = t.translate('bonjour', source_lang='fr')
+    hit = t.translate('bonjour', source_lang='fr')
+    assert hit is t.translate('bonjour', source_lang='fr')
+    assert hit.meta == {'engine': 'ctranslate2', 'cache': 'hit'}
+    with pytest.raises(TypeError):
+        hit.meta['cache'] = 'miss'  # shared by every hit, so read-only
+    assert first.meta['cache'] == 'miss'
+    padded = t.translate(' bonjour\n', source_lang='fr')
+    assert padded.original_text == ' bonjour\n' and padded.translated_text == 'BONJOUR'
+
+
+def test_inputs_without_letters_are_returned_as_is():
+    t = _translator()
+    res = t.translate_many(['12:34:56 -- 404', '...'])
+    assert [r.translated_text for r in res] == ['12:34:56 -- 404', '...']
+    assert res[0].meta == {'engine': 'noop'}
+    assert t._translator.calls == []
+
+
+def test_engine_error_results_are_not_cached():
+    t = _translator()
+    good = t._translator.translate_batch
+    def boom(batch, **kwargs):
+        raise RuntimeError('decode failed')
+    t._translator.translate_batch = boom
+    res = t.translate_many(['un', 'deux'], source_lang='fr')
+    assert [r.translated_text for r in res] == ['un', 'deux']
+    assert res[0].meta['error'] == 'decode failed'
+    t._translator.translate_batch = good
+    again = t.translate('un', source_lang='fr')
+    assert again.translated_text == 'UN' and again.meta['cache'] == 'miss'
+
+
+def test_translate_route_bounds_translators_to_supported_targets(monkeypatch):
+    import app as app_module
+    monkeypatch.setattr(app_module, '_translator_instances', {})
+    client = app_module.app.test_client()
+    for lang in ('en', 'EN', 'xx', 'de-AT ', ''):
+        client.post('/translate', data={'source_text': 'hello', 'source_lang': 'en', 'target_lang': lang})
+    assert list(app_module._translator_instances) == ['en']
@@ -0,0 +1,39 @@
+import io
+import json
+import os
+import re
+
+import app as app_module
+from app import app, LOG_CACHE, _clear_log_artifacts
+
+
+def test_upload_renders_results_and_persists_log(monkeypatch, tmp_path):
+    # Uploads clear the persistent cache, so point it at a scratch dir and persist inline
+    monkeypatch.setattr(app_module, 'CACHE_DIR', str(tmp_path))
+    monkeypatch.setattr(app_module, '_persist_entry_async', app_module._persist_entry)
+    log = ('10-16 03:00:00.000  1234  1234 E AndroidRuntime: FATAL EXCEPTION: main\r\n'
+           '10-16 03:00:00.001  1234  1234 E AndroidRuntime: Process: com.example.app, PID: 1234\n'
+           '10-16 03:00:00.002  1234  1234 I ActivityManager: Start proc com.example.app\n')
+    res = app.test_client().post('/upload', data={
+        'log_file': (io.BytesIO(log.encode()), 'device.log'),
+        'main_issue_type': 'App Crashes',
+        'sub_issue_type': 'App Crashes',
+        'package_name': 'com.example.app',
+    }, content_type='multipart/form-data')
+    log_id = None
+    try:
+        assert res.status_code == 200
+        page = res.get_data(as_text=True)
+        assert 'App Crashes - App Crashes' in page
+        log_id = re.search(r'const logId = "([0-9a-f]{32})"', page).group(1)
+        assert LOG_CACHE[log_id]['log'] == log
+        entry_dir = tmp_path / log_id
+        assert (entry_dir / 'log.txt').read_bytes() == log.encode()
+        meta = json.loads((entry_dir / 'meta.json').read_text())
+        assert meta['package_name'] == 'com.example.app'
+        assert meta['pairs'] == [{'main': 'App Crashes', 'sub': 'App Crashes'}]
+        assert sorted(os.listdir(entry_dir)) == ['log.txt', 'meta.json']
+    finally:
+        if log_id:
+            LOG_CACHE.pop(log_id, None)
+        _clear_log_artifacts()
@@ -1,14 +1,49 @@
 """Simple translation stub.
 
-This module provides a placeholder translation interface used by the
-Translate tab. Replace the body of `SimpleTranslator.translate` with
-your offline / on-device model inference (e.g., MarianMT, M2M100,
-NLLB, custom quantized model, etc.). Keep the method synchronous or
-adapt the route to async if you integrate an async engine.
+This module provides the translation interface used by the Translate tab.
+When a converted CTranslate2 model directory is configured (constructor
+``model_dir`` or ``PLM_TRANSLATOR_MODEL`` env var) translation runs fully
+offline through CTranslate2 with int8 weights; otherwise it falls back to
+deep_translator (network) and finally to a no-engine stub.
+
+A CT2 model covers one language pair, given by ``model_langs`` /
+``PLM_TRANSLATOR_MODEL_LANGS`` (e.g. ``de:en``) or read from a directory
+named like ``de-en`` / ``opus-mt-de-en``. It is only used when its target is
+``target_lang``; input detected in another source language goes to
+deep_translator (or the stub) instead, while undetected input still uses it.
+
+The model directory is expected to hold the converted model plus the
+SentencePiece ``source.spm`` / ``target.spm`` files; produce it once on an
+online machine with ``scripts/convert_translation_model.py`` (int8 weights):
+
+    python scripts/convert_translation_model.py --model Helsinki-NLP/opus-mt-de-en --output-dir models/de-en
+
+int8 GEMMs use VNNI (VPDPBUSD) on Cascade Lake / Ice Lake and newer Xeons and
+on Zen 4; older AVX2 CPUs still run int8 through a slower path, and CPUs
+without int8 support fall back to int8_float32 / float32.
+
+With ``enable_gpu=True`` (or ``PLM_TRANSLATOR_GPU=1``) and a CUDA device
+visible to CTranslate2, the model runs on GPU in float16 with CT2's fused
+kernels; otherwise it stays on CPU int8.
+
+An LLM can serve translations instead via vLLM (``llm_model`` or
+``PLM_TRANSLATOR_LLM``): its paged KV cache keeps many concurrent decodings
+on one GPU without fragmenting memory. A CT2 model directory takes precedence.
+
+Source language detection uses fastText ``lid.176.ftz`` when the ``fasttext``
+package is installed and the model file is found (``PLM_LID_MODEL`` env var,
+default ``models/lid.176.ftz`` under the repo root); otherwise langdetect.
 """
 from __future__ import annotations
-from dataclasses import dataclass
-from typing import Optional, Dict
+from collections import OrderedDict
+from dataclasses import dataclass, replace
+from types import MappingProxyType
+from typing import Optional, Mapping
+import functools
+import hashlib
+import os
+import re
+import sys
 import threading
 import time
 
@@ -20,6 +55,32 @@ except Exception:
     GoogleTranslator = None  # type: ignore
     _DT_AVAILABLE = False
 
+try:
+    # Local int8 inference engine; optional like deep_translator
+    import ctranslate2
+    import sentencepiece
+    _CT2_AVAILABLE = True
+except Exception:
+    ctranslate2 = None  # type: ignore
+    sentencepiece = None  # type: ignore
+    _CT2_AVAILABLE = False
+
+try:
+    # Paged-attention LLM serving (GPU); optional like deep_translator
+    from vllm import LLM, SamplingParams
+    _VLLM_AVAILABLE = True
+except Exception:
+    LLM = SamplingParams = None  # type: ignore
+    _VLLM_AVAILABLE = False
+
+try:
+    # C++ language ID (lid.176.ftz); preferred over langdetect when the model file exists
+    import fasttext
+    _FT_AVAILABLE = True
+except Exception:
+    fasttext = None  # type: ignore
+    _FT_AVAILABLE = False
+
 try:
     from langdetect import detect  # lightweight language detection
     _LD_AVAILABLE = True
@@ -28,115 +89,373 @@ except Exception:
     _LD_AVAILABLE = False
 
 
-@dataclass
+# __slots__ (no per-instance __dict__) needs Python 3.10+
+_SLOTS = {'slots': True} if sys.version_info >= (3, 10) else {}
+
+
+@dataclass(frozen=True, **_SLOTS)
 class TranslationResult:
     original_text: str
     translated_text: str
     detected_source_lang: Optional[str] = None
     target_lang: str = "en"
-    meta: Dict[str, str] | None = None
+    meta: Mapping[str, str] | None = None
 
 
-class SimpleTranslator:
-    """Pluggable translator stub.
+MODEL_DIR_ENV = 'PLM_TRANSLATOR_MODEL'
+MODEL_LANGS_ENV = 'PLM_TRANSLATOR_MODEL_LANGS'
+COMPUTE_TYPE_ENV = 'PLM_TRANSLATOR_COMPUTE_TYPE'
+GPU_ENV = 'PLM_TRANSLATOR_GPU'
+LLM_MODEL_ENV = 'PLM_TRANSLATOR_LLM'
+LID_MODEL_ENV = 'PLM_LID_MODEL'
+# Repo-root models/ dir, independent of the working directory the app starts from
+LID_MODEL_DEFAULT = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'models', 'lid.176.ftz')
+CACHE_MAX_ENTRIES = 500
+CACHE_SHARDS = 16  # power of two; shard = hash(key) & (CACHE_SHARDS - 1)
+
+
+def _base_lang(code: str) -> str:
+    return code.split('-')[0].lower()
+
+
+_MODEL_DIR_LANGS_RE = re.compile(r'(?:^|[-_])([a-z]{2,3})-([a-z]{2,3})$')
+
+
+def _model_langs(model_dir: str, explicit: Optional[str]) -> Optional[tuple[str, str]]:
+    """(source, target) base codes of a CT2 model from "src:tgt" or the dir name."""
+    if explicit and ':' in explicit:
+        src, tgt = explicit.split(':', 1)
+        return _base_lang(src.strip()), _base_lang(tgt.strip())
+    m = _MODEL_DIR_LANGS_RE.search(os.path.basename(os.path.normpath(model_dir)).lower())
+    return (m.group(1), m.group(2)) if m else None
+
+
+def _pick_compute_type(requested: str, device: str = "cpu") -> str:
+    """Return `requested` if the device supports it, else the nearest int8/float fallback."""
+    try:
+        supported = ctranslate2.get_supported_compute_types(device)
+    except Exception:
+        return requested
+    fallbacks = ("float16", "int8_float16", "float32") if device == "cuda" else ("int8_float32", "int8", "float32")
+    for ct in (requested, *fallbacks):
+        if ct in supported:
+            return ct
+    return "default"
+
+
+def _cuda_devices() -> int:
+    try:
+        return ctranslate2.get_cuda_device_count()
+    except Exception:
+        return 0
+
+
+_ENGINE_LOCK = threading.Lock()
+# TTL clock: immune to wall-clock jumps; read once per translate_many call
+_now = time.monotonic
+
+@functools.lru_cache(maxsize=1)
+def _get_llm(model: str):
+    """Load one vLLM engine per model, shared by all instances."""
+    return LLM(model=model, dtype="bfloat16", enforce_eager=False)
+
 
-    Replace `translate` logic with real model invocation. For example:
+_LLM_PROMPT = "Translate the following text to {lang}. Reply with the translation only.\n\n{text}\n"
 
-        from transformers import AutoTokenizer, AutoModelForSeq2SeqLM
-        ... load model once in __init__ ...
-        def translate(...):
-            tokens = self.tokenizer(text, return_tensors='pt')
-            out = self.model.generate(**tokens, max_new_tokens=256)
-            return decoded
+# Any letter (any script); inputs without one (numbers, punctuation, ids) need no translation
+_HAS_LETTER_RE = re.compile(r'[^\W\d_]')
 
-    Keep a lightweight cache if desired.
+# Sentence boundary: terminal punctuation (Latin or CJK) followed by whitespace
+_SENTENCE_END_RE = re.compile(r'(?<=[.!?\u3002\uff01\uff1f])\s+')
+
+
+def _split_sentences(text: str) -> list[list[str]]:
+    """Split `text` into lines, each a list of sentences (empty lines give [])."""
+    return [[seg for seg in _SENTENCE_END_RE.split(line.strip()) if seg] for line in text.split('\n')]
+
+
+@functools.lru_cache(maxsize=4)
+def _get_engine(model_dir: str, compute_type: str, device: str = "cpu"):
+    """Load one CT2 translator + SentencePiece pair per model, shared by all instances.
+
+    ctranslate2.Translator is safe for concurrent translate_batch calls. Keeping
+    the Translator alive for the process lifetime lets CT2 reuse its cached
+    workspace buffers instead of reallocating them per load.
+
+    For float32 models on the MKL backend, exporting
+    CT2_USE_EXPERIMENTAL_PACKED_GEMM=1 before start-up packs the weights once at
+    load; it has no effect on the int8 / float16 defaults used here.
+    """
+    translator = ctranslate2.Translator(model_dir, device=device, compute_type=compute_type,
+                                        intra_threads=os.cpu_count() or 0, inter_threads=1)
+    sp_source = sentencepiece.SentencePieceProcessor(model_file=os.path.join(model_dir, "source.spm"))
+    sp_target = sentencepiece.SentencePieceProcessor(model_file=os.path.join(model_dir, "target.spm"))
+    # Tiny dummy decode so first-call setup (workspaces, packing) happens at load time
+    try:
+        translator.translate_batch([sp_source.encode("hello", out_type=str)], max_decoding_length=4)
+    except Exception:
+        pass
+    return translator, sp_source, sp_target
+
+
+@functools.lru_cache(maxsize=1)
+def _get_lid(path: str):
+    """Load the fastText language-ID model once; None when unavailable."""
+    if not _FT_AVAILABLE or not os.path.isfile(path):
+        return None
+    try:
+        return fasttext.load_model(path)
+    except Exception:
+        return None
+
+
+def _detect_language(text: str) -> Optional[str]:
+    """Best-effort ISO code for `text` (fastText, then langdetect); None if unknown."""
+    lid = _get_lid(os.environ.get(LID_MODEL_ENV) or LID_MODEL_DEFAULT)
+    if lid is not None:
+        try:
+            # predict() rejects newlines
+            labels, _ = lid.predict(text.replace('\n', ' '), k=1)
+            return labels[0].replace('__label__', '') if labels else None
+        except Exception:
+            pass
+    if _LD_AVAILABLE:
+        try:
+            return detect(text)
+        except Exception:
+            return None
+    return None
+
+
+class SimpleTranslator:
+    """Pluggable translator.
+
+    Engines are tried in order: CTranslate2 (local model in ``model_dir``),
+    deep_translator GoogleTranslator, then a stub that echoes the input.
+    The CT2 model is loaded on first use and shared across instances.
     """
-    def __init__(self, target_lang: str = "en", cache_ttl: int = 3600, enable_translation: bool = True):
-        self.target_lang = target_lang
-        self.enable_translation = enable_translation and _DT_AVAILABLE
+    def __init__(self, target_lang: str = "en", cache_ttl: int = 3600, enable_translation: bool = True,
+                 model_dir: Optional[str] = None, compute_type: Optional[str] = None,
+                 skip_same_lang: bool = True, enable_gpu: Optional[bool] = None,
+                 llm_model: Optional[str] = None, model_langs: Optional[str] = None):
+        self.target_lang = sys.intern(target_lang)
+        # Return input untouched when it is already in the target language
+        self.skip_same_lang = skip_same_lang
+        self.enable_translation = enable_translation
+        self.engine = "stub"
         self._translator = None
+        # deep_translator kept next to CT2 for inputs outside the model's language pair
+        self._fallback = None
+        self._model_langs: Optional[tuple[str, str]] = None
+        self._engine_key: Optional[tuple[str, ...]] = None
+        self._sp_source = None
+        self._sp_target = None
         self._cache_ttl = cache_ttl
-        self._cache: dict[tuple[str, str], tuple[float, TranslationResult]] = {}
-        self._lock = threading.Lock()
-        if self.enable_translation:
+        # Independent LRU + lock per shard so concurrent lookups rarely contend
+        self._shards: list[tuple[OrderedDict[tuple[str, bytes], tuple[float, TranslationResult]], threading.Lock]] = [
+            (OrderedDict(), threading.Lock()) for _ in range(CACHE_SHARDS)]
+        self._shard_max = max(1, -(-CACHE_MAX_ENTRIES // CACHE_SHARDS))
+        if not self.enable_translation:
+            return
+        model_dir = model_dir or os.environ.get(MODEL_DIR_ENV)
+        langs = _model_langs(model_dir, model_langs or os.environ.get(MODEL_LANGS_ENV)) if model_dir else None
+        # A model of unknown pair, or one producing another language, cannot serve target_lang
+        if model_dir and _CT2_AVAILABLE and langs and langs[1] == _base_lang(self.target_lang):
+            if enable_gpu is None:
+                enable_gpu = os.environ.get(GPU_ENV, '0') == '1'
+            device = "cuda" if enable_gpu and _cuda_devices() > 0 else "cpu"
+            default_type = "float16" if device == "cuda" else "int8"
+            compute_type = _pick_compute_type(compute_type or os.environ.get(COMPUTE_TYPE_ENV) or default_type, device)
+            self._engine_key = (model_dir, compute_type, device)
+            self._model_langs = langs
+            self.engine = "ctranslate2"
+            if _DT_AVAILABLE:
+                try:
+                    self._fallback = GoogleTranslator(source='auto', target=self.target_lang)
+                except Exception:
+                    self._fallback = None
+            return
+        llm_model = llm_model or os.environ.get(LLM_MODEL_ENV)
+        if llm_model and _VLLM_AVAILABLE:
+            self._engine_key = (llm_model,)
+            self.engine = "vllm"
+            return
+        self._init_fallback()
+
+    def _init_fallback(self):
+        self.engine = "stub"
+        if _DT_AVAILABLE:
             try:
-                # Instantiate underlying translator lazily; GoogleTranslator can auto-detect source
+                # GoogleTranslator can auto-detect source
                 self._translator = GoogleTranslator(source='auto', target=self.target_lang)
+                self.engine = "deep_translator"
+                return
+            except Exception:
+                self._translator = None
+        self.enable_translation = False
+
+    def _load_engine(self):
+        """Resolve the shared CT2 / vLLM engine on first use; fall back if it cannot load."""
+        if self._engine_key is None or self._translator is not None:
+            return
+        with _ENGINE_LOCK:
+            if self._translator is not None:
+                return
+            try:
+                if self.engine == "vllm":
+                    translator = _get_llm(*self._engine_key)
+                else:
+                    translator, self._sp_source, self._sp_target = _get_engine(*self._engine_key)
+                # Publish the translator last; it is the readiness check above
+                self._translator = translator
             except Exception:
-                self.enable_translation = False
+                self._engine_key = None
+                self._init_fallback()
+
+    def warmup(self):
+        """Load (and warm) the engine now instead of on the first request."""
+        self._load_engine()
+
+    def _route(self, detected: str) -> str:
+        """Engine for a cache miss: CT2 only serves its own source language (or unknown)."""
+        if (self.engine == "ctranslate2" and detected != 'auto'
+                and _base_lang(detected) != self._model_langs[0]):
+            return "deep_translator" if self._fallback is not None else "stub"
+        return self.engine
+
+    def _run_engine(self, engine: str, texts: list[str]) -> list[str]:
+        """Translate texts with `engine`, one output per input."""
+        if engine == "ctranslate2":
+            # Translate sentence by sentence: many short, similar-length sequences
+            # batch with little padding and keep attention cost linear in input size
+            layouts = [_split_sentences(t) for t in texts]
+            batch = [self._sp_source.encode(seg, out_type=str)
+                     for lines in layouts for line in lines for seg in line]
+            # Longest first, bucketed to 8 tokens, so sub-batches hold similar lengths
+            order = sorted(range(len(batch)), key=lambda i: (len(batch[i]) + 7) & ~7, reverse=True)
+            out = self._translator.translate_batch([batch[i] for i in order], max_batch_size=4096,
+                                                   batch_type="tokens", beam_size=2, max_decoding_length=256)
+            decoded = [''] * len(batch)
+            for i, r in zip(order, out):
+                decoded[i] = self._sp_target.decode(r.hypotheses[0])
+            segs = iter(decoded)
+            return ['\n'.join(' '.join(next(segs) for _ in line) for line in lines) for lines in layouts]
+        if engine == "vllm":
+            # One generate() call; vLLM schedules the prompts together over its paged KV cache
+            prompts = [_LLM_PROMPT.format(lang=self.target_lang, text=t) for t in texts]
+            outs = self._translator.generate(prompts, SamplingParams(temperature=0.0, max_tokens=256))
+            return [o.outputs[0].text.strip() for o in outs]
+        translator = self._translator if engine == self.engine else self._fallback
+        return [translator.translate(t) for t in texts]
+
+    def _shard(self, key: tuple[str, bytes]):
+        return self._shards[hash(key) & (CACHE_SHARDS - 1)]
 
-    def _cache_get(self, key: tuple[str, str]) -> Optional[TranslationResult]:
-        with self._lock:
-            item = self._cache.get(key)
+    def _cache_get(self, key: tuple[str, bytes], stripped: str, now: float) -> Optional[TranslationResult]:
+        cache, lock = self._shard(key)
+        with lock:
+            item = cache.get(key)
             if not item:
                 return None
             ts, res = item
-            if (time.time() - ts) > self._cache_ttl:
-                self._cache.pop(key, None)
+            if (now - ts) > self._cache_ttl:
+                cache.pop(key, None)
                 return None
+            if res.original_text.strip() != stripped:
+                return None  # digest collision
+            cache.move_to_end(key)
             return res
 
-    def _cache_put(self, key: tuple[str, str], res: TranslationResult):
-        with self._lock:
-            self._cache[key] = (time.time(), res)
-            # Simple size guard
-            if len(self._cache) > 500:
-                # Drop oldest half
-                items = sorted(self._cache.items(), key=lambda kv: kv[1][0])
-                for k, _ in items[: len(items)//2]:
-                    self._cache.pop(k, None)
+    def _cache_put(self, key: tuple[str, bytes], res: TranslationResult, now: float):
+        cache, lock = self._shard(key)
+        with lock:
+            # Store the pre-built "cache: hit" variant so hits can return it as-is; every hit
+            # shares it, so its meta is a read-only view
+            cache[key] = (now, replace(res, meta=MappingProxyType({**(res.meta or {}), 'cache': 'hit'})))
+            cache.move_to_end(key)
+            # LRU size guard per shard: evict the least recently used entry
+            if len(cache) > self._shard_max:
+                cache.popitem(last=False)
 
     def translate(self, text: str, source_lang: Optional[str] = None) -> TranslationResult:
-        if not text.strip():
-            return TranslationResult(original_text=text, translated_text="(empty input)")
+        return self.translate_many([text], source_lang)[0]
 
-        detected = source_lang
-        if not detected and _LD_AVAILABLE:
-            try:
-                detected = detect(text)
-            except Exception:
-                detected = None
-        detected = detected or 'auto'
-
-        key = (detected, text.strip())
-        cached = self._cache_get(key)
-        if cached:
-            return TranslationResult(
-                original_text=text,
-                translated_text=cached.translated_text,
-                detected_source_lang=cached.detected_source_lang,
-                target_lang=self.target_lang,
-                meta={**(cached.meta or {}), 'cache': 'hit'}
-            )
-
-        if not self.enable_translation or not self._translator:
-            translated = text if detected.startswith(self.target_lang) else f"[no-engine:{self.target_lang}] {text}"
-            res = TranslationResult(
-                original_text=text,
-                translated_text=translated,
-                detected_source_lang=detected,
-                target_lang=self.target_lang,
-                meta={"engine": "stub", "note": "deep_translator not available", "cache": "miss"}
-            )
-            self._cache_put(key, res)
-            return res
+    def translate_many(self, texts: list[str], source_lang: Optional[str] = None) -> list[TranslationResult]:
+        """Translate several texts; cache misses go to the engine in one batch."""
+        results: list[Optional[TranslationResult]] = [None] * len(texts)
+        # engine name -> (index, key, text, detected) of each cache miss it should translate
+        misses: dict[str, list[tuple[int, tuple[str, bytes], str, str]]] = {}
+        self._load_engine()
+        now = _now()
+        for i, text in enumerate(texts):
+            if not text.strip():
+                results[i] = TranslationResult(original_text=text, translated_text="(empty input)")
+                continue
+            if not _HAS_LETTER_RE.search(text):
+                # Checked before detection and hashing; cheaper than any cache lookup
+                results[i] = TranslationResult(original_text=text, translated_text=text,
+                                               target_lang=self.target_lang, meta={"engine": "noop"})
+                continue
 
-        try:
-            translated = self._translator.translate(text)
-        except Exception as e:
-            translated = text
-            engine_meta = {"engine": "deep_translator", "error": str(e), "cache": "miss"}
-        else:
-            engine_meta = {"engine": "deep_translator", "cache": "miss"}
-
-        res = TranslationResult(
-            original_text=text,
-            translated_text=translated,
-            detected_source_lang=detected,
-            target_lang=self.target_lang,
-            meta=engine_meta
-        )
-        self._cache_put(key, res)
-        return res
+            # Few distinct codes; intern so keys share one object and compare by identity
+            detected = sys.intern(source_lang or _detect_language(text) or 'auto')
+            if (self.skip_same_lang and detected != 'auto'
+                    and _base_lang(detected) == _base_lang(self.target_lang)):
+                results[i] = TranslationResult(
+                    original_text=text,
+                    translated_text=text,
+                    detected_source_lang=detected,
+                    target_lang=self.target_lang,
+                    meta={"engine": "skip-same-lang"}
+                )
+                continue
+
+            # Key on a fixed-size digest so long inputs are hashed once and not held as keys
+            stripped = text.strip()
+            key = (detected, hashlib.blake2b(stripped.encode('utf-8', 'surrogatepass'), digest_size=16).digest())
+            cached = self._cache_get(key, stripped, now)
+            if cached:
+                # Same text as cached: share the instance; else only surrounding whitespace differs
+                results[i] = cached if cached.original_text == text else replace(cached, original_text=text)
+                continue
+
+            engine = self._route(detected) if self.enable_translation and self._translator else "stub"
+            if engine == "stub":
+                translated = text if _base_lang(detected) == _base_lang(self.target_lang) else f"[no-engine:{self.target_lang}] {text}"
+                res = TranslationResult(
+                    original_text=text,
+                    translated_text=translated,
+                    detected_source_lang=detected,
+                    target_lang=self.target_lang,
+                    meta={"engine": "stub", "note": "no translation engine available", "cache": "miss"}
+                )
+                self._cache_put(key, res, now)
+                results[i] = res
+                continue
+            misses.setdefault(engine, []).append((i, key, text, detected))
+
+        for engine, group in misses.items():
+            failed = False
+            try:
+                outputs = self._run_engine(engine, [m[2] for m in group])
+            except Exception as e:
+                failed = True
+                outputs = [m[2] for m in group]
+                engine_meta = {"engine": engine, "error": str(e), "cache": "miss"}
+            else:
+                engine_meta = {"engine": engine, "cache": "miss"}
+            for (i, key, text, detected), translated in zip(group, outputs):
+                res = TranslationResult(
+                    original_text=text,
+                    translated_text=translated,
+                    detected_source_lang=detected,
+                    target_lang=self.target_lang,
+                    meta=dict(engine_meta)
+                )
+                # An engine error echoes the source text; never serve that from cache
+                if not failed:
+                    self._cache_put(key, res, now)
+                results[i] = res
+        return results
 
 __all__ = ["SimpleTranslator", "TranslationResult"]